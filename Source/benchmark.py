@@ -0,0 +1,323 @@
+# Benchmarks the stages of a scan over a synthetic C/C++ corpus.
+#
+#   python3 benchmark.py generate --output corpus --files 500
+#   python3 benchmark.py run --corpus corpus --output before.json
+#   python3 benchmark.py compare before.json after.json
+#   python3 benchmark.py sanitizer --corpus corpus
+#
+# The corpus is generated from a seed, so two runs over the same parameters measure the same input.
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sys
+import time
+import tracemalloc
+
+from deprecation_check.pathutils import iter_files_from_dir
+from deprecation_check.rules import *
+from deprecation_check.scanner import SOURCE_EXTENSIONS, Scanner
+from deprecation_check.tokenizer import Token, Tokenizer, map_source
+from deprecation_check.writers import FORMATS, create_writer
+
+_NAMES = ["alpha", "beta", "gamma", "delta", "value", "count", "index", "buffer", "result", "handle"]
+_TYPES = ["int", "unsigned", "size_t", "double", "std::string", "std::vector<int>", "std::map<int, std::string>"]
+
+
+# Generates one function worth of code. density is the chance of a statement using a rule identifier.
+def _generate_function(rng, idx, identifiers, density):
+    lines = ["// Function %d, mentions gets and bzero only in comments." % idx]
+    if rng.random() < 0.3:
+        lines.append("/*")
+        lines.extend(" * %s %s" % (rng.choice(_NAMES), rng.choice(identifiers)) for _ in range(rng.randint(1, 4)))
+        lines.append(" */")
+
+    lines.append("template <typename T>")
+    lines.append("%s function_%d(const std::vector<T>& %s) {" % (rng.choice(_TYPES), idx, rng.choice(_NAMES)))
+    for _ in range(rng.randint(4, 20)):
+        roll = rng.random()
+        if roll < density:
+            lines.append("    %s(%s, %d);" % (rng.choice(identifiers), rng.choice(_NAMES), rng.randint(0, 99)))
+        elif roll < 0.3:
+            lines.append('    printf("%s: %%d\\n", %s);  // %s' % (rng.choice(identifiers), rng.choice(_NAMES), rng.choice(_NAMES)))
+        elif roll < 0.4:
+            lines.append("    const char %s = '%s';" % (rng.choice(_NAMES), rng.choice(["a", "\\n", "\\'", "\""])))
+        else:
+            lines.append("    %s %s_%d = %s * %s + %d;" % (rng.choice(_TYPES), rng.choice(_NAMES), rng.randint(0, 999),
+                                                         rng.choice(_NAMES), rng.choice(_NAMES), rng.randint(0, 99)))
+    lines.append("    return {};")
+    lines.append("}")
+    lines.append("")
+    return lines
+
+
+def generate_corpus(output, files, functions, density, seed):
+    rng = random.Random(seed)
+    identifiers = sorted(deprecatedDict) + sorted(posixDict) + sorted(windowsDict)
+    for fileidx in range(files):
+        directory = os.path.join(output, "dir%03d" % (fileidx // 100))
+        os.makedirs(directory, exist_ok=True)
+
+        lines = ["#include <vector>", "#include <string>", ""]
+        for funcidx in range(rng.randint(functions // 2, functions * 3 // 2)):
+            lines.extend(_generate_function(rng, funcidx, identifiers, density))
+
+        extension = ".h" if fileidx % 4 == 0 else ".cpp"
+        with open(os.path.join(directory, "file%05d%s" % (fileidx, extension)), "w", newline="\n") as sourcefile:
+            sourcefile.write("\n".join(lines))
+
+
+def _stage_results(wall, cpu, peak, files, nbytes, tokens):
+    return {
+        "seconds": wall,
+        "cpu_seconds": cpu,
+        "files_per_second": files / wall if wall else 0.0,
+        "mb_per_second": nbytes / (1024 * 1024) / wall if wall else 0.0,
+        "tokens_per_second": tokens / wall if wall else 0.0,
+        "peak_memory_kib": peak,
+    }
+
+
+# Runs stage() and returns its result, wall and CPU time. With trace set, the stage is run a second
+# time under tracemalloc for the peak memory it allocates, in KiB. Tracing slows Python down a lot,
+# so it is kept out of the timed run. Pages of memory-mapped files aren't allocations and don't count.
+def _run_stage(stage, trace):
+    start, startcpu = time.perf_counter(), time.process_time()
+    result = stage()
+    wall, cpu = time.perf_counter() - start, time.process_time() - startcpu
+
+    peak = None
+    if trace:
+        tracemalloc.start()
+        try:
+            stage()
+            peak = tracemalloc.get_traced_memory()[1] // 1024
+        finally:
+            tracemalloc.stop()
+    return result, wall, cpu, peak
+
+
+def _prefilter_files(filelist, prefilter):
+    matched = 0
+    for filepath in filelist:
+        with map_source(filepath) as data:
+            matched += prefilter(data)
+    return matched
+
+
+# Streams the tokens of every file the way a scan consumes them, without keeping any.
+def _lex_files(filelist, engine):
+    tokens = 0
+    for filepath in filelist:
+        for _ in Tokenizer(filepath, engine):
+            tokens += 1
+    return tokens
+
+
+def _scan_files(filelist, scanner):
+    return [scanner.check_file(filepath) or [] for filepath in filelist]
+
+
+def _write_findings(filefindings, outputformat, ruletables):
+    with open(os.devnull, "w") as devnull:
+        writer = create_writer(outputformat, devnull, ruletables)
+        for findings in filefindings:
+            writer.write_findings(findings)
+        writer.close()
+
+
+# Runs every stage over the corpus with all rule sets enabled, and returns the results. The stages
+# go through the same code as the command line tool: the prefilter, the tokenizer on its own, a full
+# Scanner.check_file per file, and the writer of every output format. Peak memory is measured in
+# the first run only.
+def run_benchmark(corpus, engine, repeat):
+    best = None
+    ruletables = enabled_rule_tables(True, True, True)
+    prefilter = build_prefilter(True, True, True)
+    scanner = Scanner(True, True, True, engine)
+    for run in range(repeat):
+        trace = run == 0
+        stages = {}
+
+        filelist, wall, cpu, peak = _run_stage(lambda: list(iter_files_from_dir(corpus, SOURCE_EXTENSIONS, True)), trace)
+        stages["discovery"] = _stage_results(wall, cpu, peak, len(filelist), 0, 0)
+        nbytes = sum(os.path.getsize(filepath) for filepath in filelist)
+
+        _, wall, cpu, peak = _run_stage(lambda: _prefilter_files(filelist, prefilter), trace)
+        stages["prefilter"] = _stage_results(wall, cpu, peak, len(filelist), nbytes, 0)
+
+        tokens, wall, cpu, peak = _run_stage(lambda: _lex_files(filelist, engine), trace)
+        stages["lexing"] = _stage_results(wall, cpu, peak, len(filelist), nbytes, tokens)
+
+        filefindings, wall, cpu, peak = _run_stage(lambda: _scan_files(filelist, scanner), trace)
+        stages["scan"] = _stage_results(wall, cpu, peak, len(filelist), nbytes, tokens)
+
+        for outputformat in FORMATS:
+            _, wall, cpu, peak = _run_stage(lambda: _write_findings(filefindings, outputformat, ruletables), trace)
+            stages["output-" + outputformat] = _stage_results(wall, cpu, peak, len(filelist), nbytes, tokens)
+
+        if best is None:
+            best = stages
+        else:
+            for name, stage in stages.items():
+                if stage["seconds"] < best[name]["seconds"]:
+                    stage["peak_memory_kib"] = best[name]["peak_memory_kib"]
+                    best[name] = stage
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "engine": engine,
+        "files": len(filelist),
+        "bytes": nbytes,
+        "tokens": tokens,
+        "findings": sum(map(len, filefindings)),
+        "stages": best,
+    }
+
+
+# The token sanitizer as it was before it was precompiled into a single findall, kept to check the
+# current one against. It works on decoded text, as the tokenizer did back then, so its tokens hold
+# text where the current ones hold bytes.
+def _legacy_sanitize_tokens(linenum, string):
+    santized_string = re.sub("<[^>]*>", "", string)  # Clip off templated arguments if possible.
+    santized_string = re.sub("[()!+-/*~^#?:><&|;{}]", " ", santized_string)  # Now remove other unnecessary characters
+    split_list = santized_string.split(" ")
+    for item in split_list:
+        if item:
+            yield Token(linenum, item)
+
+
+# Records every chunk handed to the sanitizer while lexing.
+class _RecordingTokenizer(Tokenizer):
+    def __init__(self, filepath, engine, chunks):
+        super().__init__(filepath, engine)
+        self._chunks = chunks
+
+    def _sanitize_tokens(self, linenum, raw, offset, segments=None):
+        self._chunks.append((linenum, raw, offset, segments))
+        return super()._sanitize_tokens(linenum, raw, offset, segments)
+
+
+def _time_best(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        wall = time.perf_counter() - start
+        best = wall if best is None else min(best, wall)
+    return result, best
+
+
+# Lexes the corpus once to collect the chunks the sanitizer sees, then runs the legacy and the
+# current sanitizer over all of them. Returns the number of chunks, whether both gave the same
+# identifiers on the same lines, and the best time of each.
+def compare_sanitizers(corpus, engine, repeat):
+    chunks = []
+    for filepath in iter_files_from_dir(corpus, SOURCE_EXTENSIONS, True):
+        for _ in _RecordingTokenizer(filepath, engine, chunks):
+            pass
+    texts = [(linenum, raw.decode("utf-8", "surrogateescape")) for linenum, raw, offset, segments in chunks]
+
+    tokenizer = Tokenizer("<sanitizer>", engine)
+    sanitize = tokenizer._sanitize_tokens
+    old, oldtime = _time_best(lambda: [token for linenum, text in texts for token in _legacy_sanitize_tokens(linenum, text)], repeat)
+    new, newtime = _time_best(lambda: [token for linenum, raw, offset, segments in chunks
+                                       for token in sanitize(linenum, raw, offset, segments)], repeat)
+    old = [(token.linenumber, token.raw) for token in old]
+    new = [(token.linenumber, token.raw.decode("utf-8", "surrogateescape")) for token in new]
+    return {
+        "chunks": len(chunks),
+        "identifiers": len(new),
+        "identical": old == new,
+        "old_seconds": oldtime,
+        "new_seconds": newtime,
+    }
+
+
+# Slowdowns of stages that take less than this many seconds longer are treated as noise.
+MIN_REGRESSION_SECONDS = 0.01
+
+
+# Compares the stage timings of two result files. Returns the names of the stages that got slower
+# by more than threshold (a fraction, 0.1 being 10%).
+def compare_results(old, new, threshold):
+    regressions = []
+    print("%-10s %12s %12s %9s" % ("stage", "old (s)", "new (s)", "change"))
+    for name, oldstage in old["stages"].items():
+        newstage = new["stages"].get(name)
+        if newstage is None:
+            continue
+
+        change = newstage["seconds"] / oldstage["seconds"] - 1.0 if oldstage["seconds"] else 0.0
+        flag = ""
+        if change > threshold and newstage["seconds"] - oldstage["seconds"] > MIN_REGRESSION_SECONDS:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print("%-10s %12.4f %12.4f %+8.1f%%%s" % (name, oldstage["seconds"], newstage["seconds"], change * 100, flag))
+
+    if old.get("findings") != new.get("findings"):
+        print("Number of findings changed: %s -> %s" % (old.get("findings"), new.get("findings")))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate = subparsers.add_parser("generate", help="generate a synthetic corpus")
+    generate.add_argument("--output", required=True, help="directory to write the corpus to")
+    generate.add_argument("--files", type=int, default=200, help="number of files (default: 200)")
+    generate.add_argument("--functions", type=int, default=40, help="average number of functions per file (default: 40)")
+    generate.add_argument("--density", type=float, default=0.02, help="chance of a statement using a checked identifier (default: 0.02)")
+    generate.add_argument("--seed", type=int, default=1, help="random seed (default: 1)")
+
+    run = subparsers.add_parser("run", help="benchmark a scan of a corpus")
+    run.add_argument("--corpus", required=True, help="directory containing the corpus")
+    run.add_argument("--engine", choices=Tokenizer.ENGINES, default="buffered", help="tokenizer backend to use (default: buffered)")
+    run.add_argument("--repeat", type=int, default=3, help="number of runs, the fastest of which is kept (default: 3)")
+    run.add_argument("--output", help="file to write the JSON results to instead of stdout")
+
+    compare = subparsers.add_parser("compare", help="compare two sets of results")
+    compare.add_argument("old", help="baseline results")
+    compare.add_argument("new", help="results to check")
+    compare.add_argument("--threshold", type=float, default=10.0, help="slowdown in percent that counts as a regression (default: 10)")
+
+    sanitizer = subparsers.add_parser("sanitizer", help="compare the legacy and the current token sanitizer")
+    sanitizer.add_argument("--corpus", required=True, help="directory containing the corpus")
+    sanitizer.add_argument("--engine", choices=Tokenizer.ENGINES, default="buffered", help="tokenizer backend to collect chunks with (default: buffered)")
+    sanitizer.add_argument("--repeat", type=int, default=3, help="number of runs, the fastest of which is kept (default: 3)")
+
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        generate_corpus(args.output, args.files, args.functions, args.density, args.seed)
+    elif args.command == "run":
+        results = json.dumps(run_benchmark(args.corpus, args.engine, args.repeat), indent=2, sort_keys=True)
+        if args.output:
+            with open(args.output, "w") as resultfile:
+                resultfile.write(results + "\n")
+        else:
+            print(results)
+    elif args.command == "sanitizer":
+        results = compare_sanitizers(args.corpus, args.engine, args.repeat)
+        print("%d chunks, %d identifiers" % (results["chunks"], results["identifiers"]))
+        print("legacy:  %.4f s" % results["old_seconds"])
+        print("current: %.4f s" % results["new_seconds"])
+        if not results["identical"]:
+            print("The sanitizers gave different identifiers")
+            sys.exit(1)
+        print("Both gave the same identifiers")
+    else:
+        with open(args.old) as oldfile, open(args.new) as newfile:
+            regressions = compare_results(json.load(oldfile), json.load(newfile), args.threshold / 100.0)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,333 +17,279 @@
 # For anyone actually experienced in Python, I'm so sorry.
 
 import argparse
+import cProfile
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain
 
-from pathutils import *
-from tokenizer import Tokenizer
-
-# C/C++ standard library
-deprecatedDict = {
-    "auto_ptr"                   : "auto_ptr is deprecated as of C++11. Consider using std::shared_ptr or std::unique_ptr.",
-    "binary_function"            : "binary_function is deprecated as of C++11. Consider using std::function instead.",
-    "binder1st"                  : "binder1st is deprecated as of C++11. Consider using std::bind instead.",
-    "binder2nd"                  : "binder2nd is deprecated as of C++11. Consider using std::bind instead.",
-    "bind1st"                    : "bind1st is deprecated as of C++11. Consider using std::bind instead.",
-    "bind2nd"                    : "bind2nd is deprecated as of C++11. Consider using std::bind instead.",
-    "CLK_TCK"                    : "CLK_TCK is deprecated. Consider using CLOCKS_PER_SEC instead.",
-    "const_mem_fun_t"            : "const_mem_fun_t is deprecated as of C++11.",
-    "const_mem_fun1_t"           : "const_mem_fun1_t is deprecated as of C++11.",
-    "const_mem_fun_ref_t"        : "const_mem_fun_ref_t is deprecated as of C++11.",
-    "const_mem_fun1_ref_t"       : "const_mem_fun1_ref_t is deprecated as of C++11.",
-    "get_unexpected"             : "get_unexpected is deprecated as of C++11. Consider using noexcept instead.",
-    "gets"                       : "gets is removed in the C11 and C++11 standards.",
-    "istrstream"                 : "istrstream is deprecated as of C++11. Consider using std::istringstream instead.",
-    "mem_fun"                    : "mem_fun is deprecated as of C++11. Consider using std::mem_fn instead.",
-    "mem_fun_ref"                : "mem_fun_ref is deprecated as of C++11. Consider std::mem_fn instead.",
-    "mem_fun_ref_t"              : "mem_fun_ref_t is deprecated as of C++11.",
-    "mem_fun1_ref_t"             : "mem_fun1_ref_t is deprecated as of C++11.",
-    "mem_fun_t"                  : "mem_fun_t is deprecated as of C++11.",
-    "mem_fun1_t"                 : "mem_fun1_t is deprecated as of C++11.",
-    "ostrstream"                 : "ostrstream is deprecated as of C++11. Consider using std::ostringstream instead.",
-    "pointer_to_binary_function" : "pointer_to_binary_function is deprecated as of C++11. Consider using std::bind or std::function instead.",
-    "pointer_to_unary_function"  : "pointer_to_unary_function is deprecated as of C++11. Consider using std::bind or std::function instead.",
-    "ptr_fun"                    : "ptr_fun is deprecated as of C++11. Consider using std::function or std::ref instead.",
-    "random_shuffle"             : "random_shuffle is deprecated as of C++14. Consider using std::shuffle instead.",
-    "set_unexpected"             : "set_unexpected is deprecated as of C++11. Consider using noexcept instead.",
-    "strstream"                  : "strstream is deprecated as of C++11. Consider using std::stringstream instead.",
-    "strstreambuf"               : "strstreambuf is deprecated as of C++11. Consider using std::stringstream instead.",
-    "unary_function"             : "unary_function is deprecated as of C++11. Consider using std::function instead.",
-    "unexpected"                 : "unexpected is deprecated as of C++11.",
-    "unexpected_handler"         : "unexpected_handler is deprecated as of C++11.",
-}
-
-# Functions that likely have better alternatives
-cautionaryDict = {
-    "alloca" : "alloca can be a dangerous function to use.\nIf the allocation attempt by alloca causes a stack overflow, then behavior is undefined.\nConsider using malloc, new, an STL container, or a smart pointer.",
-    "itoa"   : "itoa is not a standardized library function.\nConsider using snprintf instead.",
-    "rand"   : "Use of rand is not recommended. Consider using the functionality provided in the <random> header instead.",
-    "scanf"  : "scanf can be a dangerous function to use.\nIt is more difficult to ensure the receiving buffer won't overflow. Consider using sscanf instead.",
-    "srand"  : "Use of srand is not recommended. Consider using the functionality provided in the <random> header instead.",
-}
-
-# POSIX API-related warnings
-posixDict = {
-    "bcmp"                      : "bcmp is a POSIX legacy function, and is removed as of POSIX.1-2008. Consider using memcmp instead.",
-    "bcopy"                     : "bcopy is a POSIX legacy function, and is removed as of POSIX.1-2008. Consider using memcpy instead.",
-    "bzero"                     : "bzero is a POSIX legacy function, and is removed as of POSIX.1-2008. Consider using memset instead.",
-    "cuserid"                   : "cuserid is a POSIX legacy function and is removed as of POSIX.1-2001. Consider replacing it with getpwuid(geteuid()).",
-    "ecvt"                      : "ecvt is a POSIX legacy function. Consider using std::to_string or snprintf instead.",
-    "fcvt"                      : "fcvt is a POSIX legacy function. Consider using std::to_string or snprintf instead.",
-    "ftime"                     : "ftime is a POSIX legacy function. Consider using functions provided by the chrono header in C++11 instead.",
-    "gcvt"                      : "gcvt is a POSIX legacy function. Consider using std::to_string or snprintf instead.",
-    "gethostbyaddr"             : "gethostbyaddr has been obsoleted in POSIX 1003.1. Consider using getaddrinfo instead.",
-    "gethostbyname"             : "gethostbyname has been obsoleted in POSIX 1003.1. Consider using getnameinfo instead.",
-    "getwd"                     : "getwd is a POSIX legacy function. Consider using getcwd instead.",
-    "inet_addr"                 : "inet_addr is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
-    "inet_aton"                 : "inet_aton is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
-    "inet_lnaof"                : "inet_lnaof is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
-    "inet_makeaddr"             : "inet_makeaddr is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
-    "inet_netof"                : "inet_netof is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
-    "inet_network"              : "inet_network is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
-    "inet_nsap_addr"            : "inet_nsap_addr is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
-    "inet_nsap_ntoa"            : "inet_nsap_ntoa is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
-    "inet_ntoa"                 : "inet_ntoa is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
-    "inet_ntop"                 : "inet_ntop is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
-    "inet_pton"                 : "inet_pton is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
-    "mktemp"                    : "mktemp is a POSIX legacy function. Consider using mkstemp instead, or investigate a cross platform solution.",
-    "utimes"                    : "utimes is a POSIX legacy function. Consider using utime instead.",
-    "wcswcs"                    : "wcswcs is a POSIX legacy function. Consider using wcsstr or std::wstring instead.",
-}
-
-# Windows API-related warnings
-windowsDict = {
-    "AddMRUStringW"                      : "AddMRUStringW is deprecated as of Windows Vista.",
-    "AppendMenuWrapW"                    : "AppendMenuWrapW should not be used. Consider using AppendMenuW instead.",
-    "CallCPLEntry16"                     : "CallCPLEntry16 is removed as of Windows Vista.",
-    "CallWindowProcWrapW"                : "CallWindowProcWrapW should not be used. Consider using CallWindowProcW instead.",
-    "CanShareFolderW"                    : "CanShareFolderW is deprecated as of Windows Vista.",
-    "ChangeWindowMessageFilter"          : "Using ChangeWindowMessageFilter is not recommended. It is recommended that ChangeWindowMessageFilterEx be used instead.",
-    "CharLowerWrapW"                     : "CharLowerWrapW should not be used. Consider using CharLowerW instead.",
-    "CharUpperWrapW"                     : "CharUpperWrapW should not be used. Consider using CharUpperW instead.",
-    "CharUpperBuffWrapW"                 : "CharUpperBuffWrapW should not be used. Consider using CharUpperBuff instead.",
-    "CIDLData_CreateFromIDArray"         : "CIDLData_CreateFromIDArray is removed as of Windows Vista.",
-    "CompareStringWrapW"                 : "CompareStringWrapW should not be used. Consider using CompareStringEx instead.",
-    "CopyFileWrapW"                      : "CopyFileWrapW should not be used. Consider using CopyFile instead.",
-    "ConnectToConnectionPoint"           : "ConnectToConnectionPoint is deprecated as of Windows Vista.",
-    "CreateEventWrapW"                   : "CreateEventWrapW should not be used. Consider using CreateEvent or CreateEventEx instead.",
-    "CreateFileWrapW"                    : "CreateFileWrapW should not be used. Consider using CreateFile instead.",
-    "CreateHardwareMoniker"              : "CreateHardwareMoniker is deprecated as of Windows Vista.",
-    "CreateUserProfileEx"                : "CreateUserProfileEx has been removed in Windows Vista.",
-    "CreateWindowExWrapW"                : "CreateWindowExWrapW should not be used. Consider using CreateWindowEx instead.",
-    "CscSearchApiGetInterface"           : "CscSearchApiGetInterface is deprecated as of Windows 7.",
-    "DAD_AutoScroll"                     : "DAD_AutoScroll is deprecated as of Windows Vista.",
-    "DAD_DragEnterEx"                    : "DAD_DragEnterEx is deprecated as of Windows Vista. Consider using ImageList_DragEnter instead.",
-    "DAD_DragEnterEx2"                   : "DAD_DragEnterEx2 is deprecated as of Windows Vista. Consider using ImageList_DragEnter instead.",
-    "DAD_DragLeave"                      : "DAD_DragLeave is deprecated as of Windows Vista. Consider using ImageList_DragLeave instead.",
-    "DAD_DragMove"                       : "DAD_DragMove is deprecated as of Windows Vista. Consider using ImageList_DragMove instead.",
-    "DAD_SetDragImage"                   : "DAD_SetDragImage is deprecated as of Windows Vista. Consider using ImageList_BeginDrag instead.",
-    "DAD_ShowDragImage"                  : "DAD_ShowDragImage is deprecated as of Windows Vista. Consider using ImageList_DragShowNoLock instead.",
-    "DoEnvironmentSubst"                 : "DoEnvironmentSubst is deprecated as of Windows Vista. Consider using ExpandEnvironmentStrings instead.",
-    "DefWindowProcWrapW"                 : "DefWindowProcWrapW should not be used. Consider using DefWindowProc instead.",
-    "DeleteFileWrapW"                    : "DeleteFileWrapW should not be used. Consider using DeleteFile instead.",
-    "DialogBoxParamWrapW "               : "DialogBoxParamWrapW should not be used. Consider using DialogBoxParam instead.",
-    "DispatchMessageWrapW"               : "DispatchMessage should not be used. Consider using DispatchMessage instead.",
-    "DragQueryFileWrapW"                 : "DragQueryFileWrapW should not be used. Consider using DragQueryFile instead.",
-    "DrawTextExWrapW"                    : "DrawTextExWrapW should not be used. Consider using DrawTextEx instead.",
-    "DrawTextWrapW"                      : "DrawTextWrapW should not be used. Consider using DrawText instead.",
-    "DriveType"                          : "DriveType is deprecated as of Windows Vista. Consider using GetDriveType in the Volume Management API instead.",
-    "DwmEnableComposition"               : "DwmEnableComposition is deprecated as of Windows 8. DWM can no longer be programmatically disabled.",
-    "DwmModifyPreviousDxFrameDuration"   : "DwmModifyPreviousDxFrameDuration is no longer supported starting with Windows 8.1.",
-    "DwmSetDxFrameDuration"              : "DwmSetDxFrameDuration is no longer supported starting with Windows 8.1.",
-    "DwmSetPresentParameters"            : "DwmSetPresentParameters is no longer supported starting with Windows 8.1.",
-    "EnumMRUListW"                       : "EnumMRUListW is deprecated as of Windows Vista.",
-    "EstimateFileRisk"                   : "EstimateFileRisk is deprecated as of Windows Vista. IAttachmentExecute should be used instead.",
-    "ExtractAssociatedIconEx"            : "ExtractAssociatedEx is deprecated.",
-    "ExtTextOutWrapW"                    : "ExtTextOutWrapW should not be used. Consider using ExtTextOut instead.",
-    "FindResourceWrapW"                  : "FindResourceWrapW should not be used. Consider using FindResourceW instead.",
-    "FormatMessageWrapW"                 : "FormatMessageWrapW should not be used. Consider using FormatMessage instead.",
-    "GetClassInfo"                       : "GetClassInfo has been superseded by GetClassInfoEx. Consider using it instead.",
-    "GetClassInfoWrapW"                  : "GetClassInfoWrapW should not be used. Consider using GetClassInfoEx instead.",
-    "GetClassLong"                       : "GetClassLong has been superseded by GetClassLongPtr. Consider using it instead to have 32-bit and 64-bit compatible code.",
-    "GetClassWord"                       : "GetClassWord is a compatibility function for 16-bit versions of Windows. Strongly consider using GetClassLongPtr instead.",
-    "GetDateFormatWrapW"                 : "GetDateFormatWrapW should not be used. Consider using GetDateFormatEx instead.",
-    "GetDlgItemTextWrapW"                : "GetDlgItemTextWrapW should not be used. Consider using GetDlgItemTextWrapW instead.",
-    "GetFileAttributesWrapW"             : "GetFileAttributesWrapW should not be used. Consider using GetFileAttributes or GetFileAttributesEx instead.",
-    "GetFileNameFromBrowse"              : "GetFileNameFromBrowse is deprecated as of Windows Vista.",
-    "GetLocaleInfoWrapW"                 : "GetLocaleWrapW should not be used. Consider using GetLocalInfoEx instead.",
-    "GetMenuItemInfoWrapW"               : "GetMenuItemInfoWrapW should not be used. Consider using GetMenuItemInfo instead",
-    "GetMenuPosFromID"                   : "GetMenuPosFromID is deprecated.",
-    "GetModuleFileNameWrapW"             : "GetModuleFileNameWrapW should not be used. Consider using GetModuleFileName or GetModuleFileNameEx instead.",
-    "GetModuleHandleWrapW"               : "GetModuleHandleWrapW should not be used. Consider using GetModuleHandle or GetModuleHandleEx instead.",
-    "GetObjectWrapW"                     : "GetObjectWrapW should not be used. Consider using GetObject instead.",
-    "GetOpenFileName"                    : "GetOpenFileName has been superseded by the Common Item Dialog in Windows Vista. Consider using it instead.",
-    "GetOpenFileNameWrapW"               : "GetOpenFileNameWrapW should not be used. Consider using the Common Item Dialog instead.",
-    "GetSaveFileName"                    : "GetSaveFileName has been superseded by the Common Item Dialog in Windows Vista. Consider using it instead.",
-    "GetSaveFileNameWrapW"               : "GetSaveFileNameWrapW should not be used. Consider using the Common Item Dialog instead.",
-    "GetSystemDirectoryWrapW"            : "GetSystemDirectoryWrapW should not be used. Consider using GetSystemDirectory instead.",
-    "GetTimeFormatWrapW"                 : "GetTimeFormatWrapW should not be used. Consider using GetTimeFormatW instead.",
-    "GetVersionEx"                       : "GetVersionEx is deprecated as of Windows 8.1. Consider using the Version Helper API functions instead.",
-    "GetWindowLong"                      : "GetWindowLong has been superseded by GetWindowLongPtr. Consider using it instead to have 32-bit and 64-bit compatible code.",
-    "GetWindowLongWrapW"                 : "GetWindowLongWrapW should not be used. Consider using GetWindowLong, or GetWindowLongPtr if a handle is being retrieved.",
-    "GetWindowsDirectoryWrapW"           : "GetWindowsDirectoryWrapW should not be used. Consider using GetWindowsDirectory instead.",
-    "GetWindowTextLengthWrapW"           : "GetWindowTextLengthWrapW should not be used. Consider using GetWindowTextLength instead.",
-    "GetWindowTextWrapW"                 : "GetWindowTextWrapW should not be used. Consider using GetWindowText instead.",
-    "GUIDFromString"                     : "GUIDFromString has been deprecated as of Windows Vista. Consider using CLSIDFromString or IIDFromString instead.",
-    "ILLoadFromStream"                   : "ILLoadFromStream is deprecated as of Windows Vista.",
-    "InsertMenuItemWrapW"                : "InsertMenuItemWrapW should not be used. Consider using InsertMenuItem instead.",
-    "IsCharAlphaWrapW"                   : "IsCharAlphaWrapW should not be used. Consider using IsCharAlpha instead.",
-    "IsCharAlphaNumericWrapW"            : "IsCharAlphaNumericWrapW should not be used. Consider using IsCharAlphaNumeric instead.",
-    "IsCharUpperWrapW"                   : "IsCharUpperWrapW should not be used. Consider using IsCharUpper instead.",
-    "IsNetDrive"                         : "IsNetDrive is deprecated as of Windows Vista. Consider using GetDriveType in the Volume Management API, or WNetGetConnection in the Networking API instead.",
-    "IsUserAnAdmin"                      : "IsUserAnAdmin is deprecated as of Windows Vista.",
-    "LinkWindow_RegisterClass"           : "LinkWindow_Register class is deprecated as of Windows Vista. Consider using InitCommonControlsEx instead.",
-    "LinkWindow_UnregisterClass"         : "LinkWindow_Register class is deprecated as of Windows Vista.",
-    "LoadLibraryWrapW"                   : "LoadLibraryWrapW should not be used. Consider using LoadLibrary or LoadLibraryEx instead.",
-    "LoadStringWrapW"                    : "LoadStringWrapW should not be used. Consider using LoadString instead.",
-    "MessageBoxWrapW"                    : "MessageBoxWrapW should not be used. Consider using MessageBox instead.",
-    "MoveFileWrapW"                      : "MoveFileWrapW should not be used. Consider using MoveFile, MoveFileEx, MoveFileWithProgress, or MoveFileTransacted instead.",
-    "MLFreeLibrary"                      : "MLFreeLibrary is removed as of Windows 7.",
-    "MLHtmlHelp"                         : "MLHtmlHelp is deprecated as of Windows Vista.",
-    "MLLoadLibrary"                      : "MLLoadLibrary is removed as of Windows 7.",
-    "MLWinHelp"                          : "MLWinHelp is deprecated as of Windows Vista.",
-    "OFNHookProc"                        : "OFNHookProc is deprecated as of Windows Vista. Consider using the Common Item Dialog instead.",
-    "OFNHookProcOldStyle"                : "OFNHookProcOldStyle is deprecated as of Windows Vista. Consider using the Common Item Dialog instead.",
-    "OpenRegStream"                      : "OpenRegStream is deprecated as of Windows Vista. Consider using SHOpenRegStream2 instead.",
-    "OutputDebugStringWrapW"             : "OutputDebugStringWrapW is deprecated as of Windows Vista. Consider using OutputDebugStringW instead.",
-    "PassportWizardRunDll"               : "PassportWizardRunDll is deprecated as of Windows Vista.",
-    "PathCleanupSpec"                    : "PathCleanupSpec is deprecated as of Windows Vista.",
-    "PathGetShortPath"                   : "PathGetShortPath is deprecated as of Windows Vista.",
-    "PathIsExe"                          : "PathIsExe is deprecated as of Windows Vista.",
-    "PathIsSlow"                         : "PathIsSlow is deprecated as of Windows Vista.",
-    "PathProcessCommand"                 : "PathProcessCommand is deprecated as of Windows Vista.",
-    "PathResolve"                        : "PathResolve is deprecated as of Windows Vista.",
-    "PeekMessageWrapW"                   : "PeekMessageWrapW should not be used. Consider using PeekMessage instead.",
-    "PerUserInit"                        : "PerUserInit is deprecated as of Windows Vista.",
-    "PickIconDlg"                        : "PickIconDlg is deprecated as of Windows Vista.",
-    "PostMessageWrapW"                   : "PostMessageWrapW should not be used. Consider PostMessage or PostThreadMessage instead.",
-    "PrintDlg"                           : "PrintDlg is deprecated as of Windows XP. Consider using PrintDlgEx or PageSetupDlg instead.",
-    "ReadCabinetState"                   : "ReadCabinetState is deprecated as of Windows Vista.",
-    "RealDriveType"                      : "RealDriveType is deprecated as of Windows Vista. Consider using GetDriveType in the Volume Management API instead.",
-    "RegCreateKeyExWrapW"                : "RegCreateKeyExWrapW should not be used. Consider using RegCreateKeyEx or RegCreateKeyTransacted instead.",
-    "RegisterClass"                      : "RegisterClass has been superseded by RegisterClassEx. Consider using it instead.",
-    "RegisterClassWrapW"                 : "RegisterClassWrapW should not be used. Consider using RegisterClassEx instead.",
-    "RegOpenKeyExWrapW"                  : "RegOpenKeyExWrapW should not be used. Consider using RegOpenKeyEx or RegOpenKeyTransacted instead.",
-    "RegQueryValue"                      : "RegQueryValue has been superseded by RegQueryValueEx. Consider using it instead.",
-    "RegQueryValueExWrapW"               : "RegQueryValueExWrapW should not be used. Consider using RegQueryValueEx instead.",
-    "RegSetValueExWrapW"                 : "RegSetValueExWrapW should not be used. Consider using RegSetValueEx instead.",
-    "RestartDialog"                      : "RestartDialog is deprecated in Windows Vista. Consider using ExitWindowsEx instead.",
-    "RestartDialogEx"                    : "RestartDialogEx is deprecated in Windows Vista. Consider using ExitWindowsEx instead.",
-    "SendMessageWrapW"                   : "SendMessageWrapW should not be used. Consider using SendMessage instead.",
-    "SetClassLong"                       : "GetClassLong has been superseded by GetClassLongPtr. Consider using it instead to have 32-bit and 64-bit compatible code.",
-    "SetClassWord"                       : "SetClassWord is a compatibility function for 16-bit versions of Windows. Strongly consider using SetClassLongPtr instead.",
-    "SetDlgItemTextWrapW"                : "SetDlgItemTextWrapW should not be used. Consider using SetDlgItemText instead.",
-    "SetWindowLong"                      : "SetWindowLong has been superseded by SetWindowLongPtr. Consider using it instead to have 32-bit and 64-bit compatible code.",
-    "SetWindowLongWrapW"                 : "SetWindowLongWrapW should not be used. Consider using SetWindowLong, or SetWindowLongPtr if a handle is being set instead.",
-    "SetWindowTextWrapW"                 : "SetWindowTextWrapW should not be used. Consider using SetWindowText instead.",
-    "ShellExecuteExWrapW"                : "ShellExecuteExWrapW should not be used. Consider using ShellExecuteEx instead.",
-    "ShellMessageBoxWrapW"               : "ShellMessageBoxWrapW should not be used. Consider using ShellMessageBox instead.",
-    "SHAddFromPropSheetExtArray"         : "SHAddFromPropSheetExtArray is deprecated as of Windows Vista.",
-    "SHAlloc"                            : "SHAlloc is deprecated as of Windows Vista. Consider using CoTaskMemAllocInstead,",
-    "SHAllocShared"                      : "SHAllocShared is deprecated as of Windows Vista.",
-    "SHAnsiToAnsi"                       : "SHAnsiToAnsi is deprecated as of Windows Vista.",
-    "SHAnsiToUnicode"                    : "SHAnsiToUnicode is deprecated as of Windows Vista.",
-    "SHCloneSpecialIDList"               : "SHCloneSpecialIDList is deprecated as of Windows Vista. Consider using SHGetSpecialFolderLocation instead.",
-    "SHCLSIDFromString"                  : "SHCLSIDFromString is deprecated as of Windows Vista. Consider using CLSIDFromString instead.",
-    "SHCoCreateInstance"                 : "SHCoCreateInstance is deprecated as of Windows Vista. Consider using CoCreateInstanceInstead.",
-    "SHCreateDirectory"                  : "SHCreateDirectory is deprecated as of Windows Vista.",
-    "SHCreateDirectoryEx"                : "SHCreateDirectoryEx is deprecated as of Windows Vista.",
-    "SHCreateFileExtractIcon"            : "SHCreateFileExtractIcon is deprecated as of Windows Vista.",
-    "SHCreateProcessAsUserW"             : "SHCreateProcessAsUserW is removed as of Windows Vista.",
-    "SHCreatePropSheetExtArray"          : "SHCreatePropSheetExtArray is deprecated as of Windows Vista.",
-    "SHCreateQueryCancelAutoPlayMoniker" : "SHCreateQueryCancelAutoPlayMoniker is deprecated as of Windows Vista. Consider using CreateClassMoniker instead.",
-    "SHCreateStdEnumFmtEtc"              : "SHCreateStdEnumFmtEtc is deprecated as of Windows Vista.",
-    "SHCreateStreamOnFile"               : "SHCreateStreamOnFile is deprecated as of Windows Vista. Consider using SHCreateStreamOnFileEx.",
-    "SHDestroyPropSheetExtArray"         : "SHDestroyPropSheetExtArray is deprecated as of Windows Vista.",
-    "Shell_GetCachedImageIndex"          : "Shell_GetCachedImageIndex is deprecated as of Windows Vista. Consider using Shell_GetCachedImageIndexA or Shell_GetCachedImageIndexW instead.",
-    "Shell_GetImageLists"                : "Shell_GetImageLists is deprecated as of Windows Vista.",
-    "Shell_MergeMenus"                   : "Shell_MergeMenus is deprecated as of Windows Vista.",
-    "ShellMessageBox"                    : "ShellMessageBox is deprecated as of Windows Vista.",
-    "SHExtractIconsW"                    : "SHExtractIconsW is deprecated as of Windows Vista.",
-    "SHFind_InitMenuPopup"               : "SHFind_InitMenuPopup is deprecated as of Windows Vista.",
-    "SHFindFiles"                        : "SHFindFiles is deprecated as of Windows Vista.",
-    "SHFlushClipboard"                   : "SHFlushClipboard is removed in Windows Vista. Consider using OleFlushClipboard instead.",
-    "SHFlushSFCache"                     : "SHFlushSFCache is deprecated as of Windows Vista.",
-    "SHFormatDateTime"                   : "SHFormatDateTime is deprecated as of Windows Vista.",
-    "SHFormatDrive"                      : "SHFormatDrive is deprecated as of Windows Vista.",
-    "SHFree"                             : "SHFree is deprecated as of Windows Vista. Consider using CoTaskMemFree instead.",
-    "SHFreeShared"                       : "SHFreeShared is deprecated as of Windows Vista.",
-    "SHGetAttributesFromDataObject"      : "SHGetAttributesFromDataObject is deprecated as of Windows Vista.",
-    "SHGetFileInfoWrapW"                 : "SHGetFileInfoWrapW should not be used. Consider using SHGetFileInfo instead.",
-    "SHGetFolderLocation"                : "SHGetFolderLoacation is deprecated as of Windows Vista. Consider using SHGetKnownFolderIDList instead.",
-    "SHGetFolderPath"                    : "SHGetFolderPath is deprecated as of Windows Vista. Consider using SHGetKnownFolderPath instead.",
-    "SHGetFolderPathAndSubDir"           : "SHGetFolderPathAndSubDir is deprecated as of Windows Vista.",
-    "SHGetInverseCMAP"                   : "SHGetInverseCMAP is deprecated as of Windows Vista.",
-    "SHGetMalloc"                        : "SHGetMalloc is deprecated as of Windows Vista. Consider using CoTaskMemAlloc instead.",
-    "SHGetPathFromIDListWrapW"           : "SHGetPathFromIDListWrapW should not be used. Consider using SHGetPathFromIDList instead.",
-    "SHGetRealIDL"                       : "SHGetRealIDL is deprecated as of Windows Vista.",
-    "SHGetSetFolderCustomSettings"       : "SHGetSetFolderCustomSettings is deprecated as of Windows Vista.",
-    "SHGetSetSettings"                   : "SHGetSetSettings is deprecated as of Windows Vista.",
-    "SHGetShellStyleHInstance"           : "SHGetShellStyleHInstance is removed in Windows Vista and later.",
-    "SHGetSpecialFolderLocation"         : "SHGetSpecialFolderLocation is deprecated as of Windows 2000. Consider using SHGetKnownFolderIDList instead.",
-    "SHGetSpecialFolderPath"             : "SHGetSpecialFolderPath is deprecated as of Windows 2000. Consider using SHGetKnownFolderPath instead.",
-    "SHGetViewStatePropertyBag"          : "SHGetViewStatePropertyBag is deprecated as of Windows Vista.",
-    "SHHandleUpdateImage"                : "SHHandleUpdateImage is deprecated as of Windows Vista.",
-    "SHILCreateFromPath"                 : "SHILCreateFromPath is deprecated as of Windows Vista. Consider using SHParseDisplayName instead.",
-    "SHInvokePrinterCommand"             : "SHInvokePrinterCommand is deprecated as of Windows Vista. It is recommended to invoke verbs on printers via IContextMenu or ShellExecute.",
-    "SHIsChildOrSelf"                    : "SHIsChildOrSelf is deprecated as of Windows Vista.",
-    "SHLimitInputEdit"                   : "SHLimitInputEdit is deprecated as of Windows Vista.",
-    "SHLoadOLE"                          : "SHLoadOLE is deprecated as of Windows Vista.",
-    "SHLockShared"                       : "SHLockShared is deprecated as of Windows Vista.",
-    "SHMapIDListToImageListIndexAsync"   : "SHMapIDListToImageListIndexAsync is removed in Windows Vista.",
-    "SHMapPIDLToSystemImageListIndex"    : "SHMapPIDLToSystemImageListIndex is deprecated as of Windows Vista.",
-    "SHMessageBoxCheck"                  : "SHMessageBoxCheck is deprecated as of Windows Vista.",
-    "SHObjectProperties"                 : "SHObjectProperties is deprecated as of Windows Vista.",
-    "SHOpenPropSheet"                    : "SHOpenPropSheet is deprecated as of Windows Vista.",
-    "SHOpenRegStream"                    : "SHOpenRegStream has been superseded by SHOpenRegStream2. Consider using it instead.",
-    "SHRegGetBoolValueFromHKCUHKLM"      : "SHRegGetBoolValueFromHKCUHKLM is deprecated as of Windows Vista.",
-    "SHRegGetValue"                      : "SHRegGetValue is deprecated as of Windows Vista. Consider using RegGetValue instead.",
-    "SHRegGetValueFromHKCUHKLM"          : "SHRegGetValueFromHKCUHKLM is deprecated as of Windows Vista.",
-    "SHReplaceFromPropSheetExtArray"     : "SHReplaceFromPropSheetExtArray is deprecated as of Windows Vista.",
-    "SHRestricted"                       : "SHRestricted is deprecated as of Windows Vista.",
-    "SHSetFolderPath"                    : "SHSetFolderPath is deprecated as of Windows Vista. Consider using SHSetKnownFolderPath instead.",
-    "SHSendMessageBroadcast"             : "SHSendMessageBroadcast is deprecated as of Windows Vista. Consider using SendMessage with the hWnd parameter as HWND_BROADCAST instead.",
-    "SHShellFolderView_Message"          : "SHShellFolderView_Message is deprecated as of Windows Vista.",
-    "SHSimpleIDListFromPath"             : "SHSimpleIDListFromPath is deprecated as of Windows 8. Consider the following alternatives: \n\t1. Call SHGetDesktopFolder to obtain IShellFolder for the desktop folder.\n\t2. Get the IShellFolder's bind context (IBindCtx).\n\t3. Call IShellFolder::ParseDisplayName with the IBindCtx and the path.",
-    "SHStartNetConnectionDialog"         : "SHStartNetConnectionDialog is deprecated as of Windows Vista.",
-    "SHStripMneumonic"                   : "SHStripMneumonic is deprecated as of Windows Vista.",
-    "SHUnicodeToAnsi"                    : "SHUnicodeToAnsi is deprecated as of Windows Vista.",
-    "SHUnicodeToUnicode"                 : "SHUnicodeToUnicode is deprecated as of Windows Vista.",
-    "SHUnlockShared"                     : "SHUnlockShared is deprecated as of Windows Vista.",
-    "SHValidateUNC"                      : "SHValidateUNC is deprecated as of Windows 7.",
-    "SignalFileOpen"                     : "SignalFileOpen is deprecated as of Windows Vista.",
-    "StopWatchFlush"                     : "StopWatchFlush is deprecated as of Windows Vista.",
-    "StopWatchMode"                      : "StopWatchMode is deprecated as of Windows Vista.",
-    "TranslateAcceleratorWrapW"          : "TranslateAcceleratorWrapW should not be used. Consider using TranslateAccelerator instead.",
-    "UnregisterClassWrapW"               : "UnregisterClassWrapW should not be used. Consider using UnregisterClass instead.",
-    "UpdateAllDesktopSubscriptions"      : "UpdateAllDesktopSubscriptions is deprecated",
-    "UrlFixupW"                          : "UrlFixupW is deprecated as of Windows 8",
-    "WhichPlatform"                      : "WhichPlatform is deprecated as of Windows Vista",
-    "Win32DeleteFile"                    : "Win32DeleteFile is deprecated as of Windows Vista",
-    "WOWShellExecute"                    : "WOWShellExecute is deprecated as of Windows Vista. Consider using ShellExecute instead.",
-    "WriteCabinetState"                  : "WriteCabinetState is deprecated as of Windows Vista."
-}
-
-
-# Checks if a token contains a function name in the dictionary.
-# If present, we warn the developer by printing the corresponding suggestion.
-def tokenize_file(filepath, cautionary, posix, windows):
-    tokenizer = Tokenizer(filepath)
-    for token in tokenizer:
-        if token.string in deprecatedDict:
-            print("%s: line %d - %s" % (filepath, token.linenumber, deprecatedDict[token.string]))
-        if cautionary and token.string in cautionaryDict:
-            print("%s: line %d - %s" % (filepath, token.linenumber, cautionaryDict[token.string]))
-        if posix and token.string in posixDict:
-            print("%s: line %d - %s" % (filepath, token.linenumber, posixDict[token.string]))
-        if windows and token.string in windowsDict:
-            print("%s: line %d - %s" % (filepath, token.linenumber, windowsDict[token.string]))
+from deprecation_check.cache import ResultCache, rules_fingerprint
+from deprecation_check.gitutils import get_changed_lines
+from deprecation_check.pathutils import *
+from deprecation_check.preprocessor import iter_compile_commands_files, load_compile_commands
+from deprecation_check.rules import *
+from deprecation_check.stats import Stats, collect_stats, timed_iter
+from deprecation_check.scanner import LIMIT_CATEGORY, OVERSIZE_ACTIONS, SOURCE_EXTENSIONS, get_scanner
+from deprecation_check.tokenizer import Tokenizer
+from deprecation_check.watch import Watcher, serve, watch
+from deprecation_check.writers import FORMATS, create_writer
+
+
+# Returns the findings within a file, or None if the prefilter ruled the file out without tokenizing it.
+# options are further keyword arguments of Scanner.
+def find_deprecations(filepath, cautionary, posix, windows, engine="buffered", prefilter=True, **options):
+    return get_scanner(cautionary, posix, windows, engine, prefilter, **options).check_file(filepath)
+
+
+# Scans every file in filelist and yields (filepath, findings, cached) in the order of filelist.
+# findings is None when the prefilter skipped the file, and cached tells whether the findings came
+# from the result cache. A single job scans files while filelist is still being produced. With more
+# than one job, the whole list is gathered first and files missing from the cache are scanned in a
+# process pool, the biggest first so that a few huge files don't end up running alone at the end.
+#
+# With stats given, every file is scanned through collect_stats, and the timings are merged into stats.
+# Findings that report a file hit a limit depend on more than its contents, and aren't cached.
+def scan_files(filelist, jobs, cautionary, posix, windows, engine="buffered", prefilter=True, cache=None, stats=None,
+               options=None):
+    scanargs = (cautionary, posix, windows, engine, prefilter)
+    options = options or {}
+    if stats is None:
+        scan = find_deprecations
+    else:
+        scan = partial(collect_stats, find_deprecations)
+    executor = None
+    futures = {}
+    cached = {}
+
+    if jobs > 1:
+        filelist = list(filelist)
+
+    if jobs > 1 and len(filelist) > 1:
+        pending = []
+        for idx, filepath in enumerate(filelist):
+            entry = cache.get(filepath) if cache is not None else None
+            if entry is None:
+                pending.append(idx)
+            else:
+                cached[idx] = entry
+
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        for idx in sorted(pending, key=lambda idx: os.path.getsize(filelist[idx]), reverse=True):
+            futures[idx] = executor.submit(scan, filelist[idx], *scanargs, **options)
+
+    try:
+        for idx, filepath in enumerate(filelist):
+            if executor is None:
+                entry = cache.get(filepath) if cache is not None else None
+            else:
+                entry = cached.get(idx)
+
+            if entry is not None:
+                yield filepath, [Finding(filepath, *row) for row in entry], True
+                continue
+
+            if executor is None:
+                findings = scan(filepath, *scanargs, **options)
+            else:
+                findings = futures[idx].result()
+
+            if stats is not None:
+                findings, snapshot = findings
+                stats.merge(snapshot)
+
+            if cache is not None and not any(finding.category == LIMIT_CATEGORY for finding in findings or []):
+                cache.put(filepath, [finding[1:] for finding in findings or []])
+            yield filepath, findings, False
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+# Parses a size in bytes, optionally with a K, M or G suffix for KiB, MiB or GiB.
+def parse_size(text):
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    multiplier = units.get(text[-1:].upper(), 1)
+    try:
+        size = int(text[:-1] if multiplier != 1 else text) * multiplier
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid size: %s" % text)
+    if size < 1:
+        raise argparse.ArgumentTypeError("size has to be positive: %s" % text)
+    return size
 
 
 def main():
     parser = argparse.ArgumentParser()
+    parser.add_argument("--stats", action="store_true", help="print time spent per stage and the slowest files to stderr")
+    parser.add_argument("--profile", metavar="FILE", help="run under cProfile and write the .pstats output to FILE, worker processes of --jobs are not profiled")
     parser.add_argument("-r", "--recursive", action="store_true", help="recursive file search")
     parser.add_argument("-i", "--inputs", nargs="*", help="directories or files to check separated by spaces")
+    parser.add_argument("--exclude", action="append", default=[], metavar="PATTERN", help="skip files and directories matching a .gitignore-style pattern, may be repeated")
+    parser.add_argument("--exclude-from", metavar="FILE", help="skip files and directories matching the .gitignore-style patterns in FILE")
+    parser.add_argument("--changed-since", metavar="REV", help="check files changed in the working tree since the given git revision")
+    parser.add_argument("--changed-lines-only", action="store_true", help="with --changed-since, only report findings on changed lines")
+    parser.add_argument("--files-from", metavar="FILE", help="check the files listed in FILE, one per line, or on stdin if FILE is -")
+    parser.add_argument("--compile-commands", metavar="FILE", help="check the files of a compile_commands.json and the headers they include, every header only once")
     parser.add_argument("--cautionary", action="store_true", help="warn about functions that may have better alternatives")
     parser.add_argument("--posix", action="store_true", help="warn about certain POSIX API functions")
     parser.add_argument("--windows", action="store_true", help="warn about certain Windows API functions")
+    parser.add_argument("--no-prefilter", action="store_true", help="tokenize every file, even ones that contain none of the checked identifiers as whole words (which also finds identifiers split by comments, like ge/**/ts)")
+    parser.add_argument("--preprocess", action="store_true", help="skip code in conditionals that are never compiled, like #if 0")
+    parser.add_argument("-D", dest="defines", action="append", default=[], metavar="NAME[=VALUE]", help="treat NAME as defined in conditionals, implies --preprocess")
+    parser.add_argument("-U", dest="undefines", action="append", default=[], metavar="NAME", help="treat NAME as undefined in conditionals, implies --preprocess")
+    parser.add_argument("--max-file-size", type=parse_size, metavar="SIZE", help="limit on the size of checked files, in bytes or with a K, M or G suffix")
+    parser.add_argument("--oversize", choices=OVERSIZE_ACTIONS, default="skip", help="skip files over --max-file-size or only check their beginning (default: skip)")
+    parser.add_argument("--file-timeout", type=float, metavar="SECONDS", help="stop checking a file after this many seconds and report it")
+    parser.add_argument("--chunk-size", type=parse_size, metavar="SIZE", help="lex files in chunks of at most SIZE bytes, bounding memory use on huge files")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of files to scan in parallel, 0 uses all cores (default: 1)")
+    parser.add_argument("--cache-dir", help="directory to cache findings of unchanged files in")
+    parser.add_argument("--cache-size", type=int, default=256, help="size limit of the cache directory in MiB (default: 256)")
+    parser.add_argument("--no-cache", action="store_true", help="ignore --cache-dir and scan every file")
+    parser.add_argument("--engine", choices=Tokenizer.ENGINES, default="buffered", help="tokenizer backend to use (default: buffered)")
+    parser.add_argument("--format", choices=FORMATS, default="text", help="output format, jsonl and sarif are meant for other tools (default: text)")
+    parser.add_argument("--watch", action="store_true", help="keep running, rescan the inputs when they change and print added (+) and removed (-) findings")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between checks for changes with --watch (default: 1)")
+    parser.add_argument("--serve", action="store_true", help="answer JSON requests read line by line from stdin, see watch.py for the protocol")
 
     args = parser.parse_args()
+    if args.changed_lines_only and not args.changed_since:
+        parser.error("--changed-lines-only requires --changed-since")
+    if args.defines or args.undefines:
+        args.preprocess = True
+    if args.watch and args.serve:
+        parser.error("--watch and --serve can't be combined")
+    if args.watch and not args.inputs:
+        parser.error("--watch requires --inputs")
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(run, parser, args)
+        finally:
+            profiler.dump_stats(args.profile)
+    else:
+        run(parser, args)
+
+
+def run(parser, args):
+    stats = Stats() if args.stats else None
 
     # TODO: Let the user specify the extensions to search by.
-    extensions = (".c", ".cc", ".cpp", ".cxx", ".h", ".hh", ".hpp", ".hxx", ".tpp")
-    filelist = []
-    for file in args.inputs:
+    extensions = SOURCE_EXTENSIONS
+    excludes = ExcludePatterns()
+    for pattern in args.exclude:
+        excludes.add(pattern)
+    if args.exclude_from:
+        excludes.add_from_file(args.exclude_from)
+
+    defines = tuple(args.defines)
+    undefines = tuple(args.undefines)
+
+    # Further options of Scanner, only given when they differ from the defaults.
+    options = {}
+    if args.preprocess:
+        options.update(preprocess=True, defines=defines, undefines=undefines)
+    if args.max_file_size is not None:
+        options.update(max_file_size=args.max_file_size, oversize=args.oversize)
+    if args.file_timeout is not None:
+        options["timeout"] = args.file_timeout
+    if args.chunk_size is not None:
+        options["chunk_size"] = args.chunk_size
+
+    if args.watch or args.serve:
+        scanner = get_scanner(args.cautionary, args.posix, args.windows, args.engine, not args.no_prefilter, **options)
+        watcher = Watcher(scanner, args.inputs or [], args.recursive, extensions, excludes)
+        if args.watch:
+            watch(watcher, args.interval, sys.stdout)
+        else:
+            serve(scanner, watcher, sys.stdin, sys.stdout)
+        return
+
+    # Directories are searched lazily, so scanning starts while they are still being walked.
+    sources = []
+    for file in args.inputs or []:
         if os.path.isdir(file):
-            filelist.extend(get_files_from_dir(file, extensions, args.recursive))
+            sources.append(iter_files_from_dir(file, extensions, args.recursive, excludes))
         elif os.path.isfile(file):
-            filelist.append(file)
+            sources.append([file])
+
+    if args.files_from:
+        if args.files_from == "-":
+            listed = sys.stdin.read().splitlines()
+        else:
+            with open(args.files_from) as listfile:
+                listed = listfile.read().splitlines()
+        sources.append([file for file in listed if file and os.path.isfile(file)])
+
+    if args.compile_commands:
+        try:
+            units = load_compile_commands(args.compile_commands)
+        except (OSError, ValueError, KeyError) as error:
+            parser.error("Can't read %s: %s" % (args.compile_commands, error))
+        sources.append(iter_compile_commands_files(units, extensions, args.preprocess, defines, undefines))
+
+    changedlines = None
+    if args.changed_since:
+        try:
+            changedlines = get_changed_lines(os.getcwd(), args.changed_since)
+        except (OSError, RuntimeError) as error:
+            parser.error(str(error))
+
+        sources.append([os.path.relpath(file) for file in sorted(changedlines)
+                        if file.endswith(extensions) and os.path.isfile(file)])
+
+    filelist = chain.from_iterable(sources)
+    if stats is not None:
+        filelist = timed_iter("discovery", filelist, "files", stats)
+
+    prefilter = not args.no_prefilter
+
+    ruletables = enabled_rule_tables(args.cautionary, args.posix, args.windows)
+    cache = None
+    if args.cache_dir and not args.no_cache:
+        # The engine and the prefilter change findings in corner cases, so they are part of it as well.
+        settings = {name: value for name, value in options.items() if name not in ("timeout", "chunk_size")}
+        settings.update(engine=args.engine, prefilter=prefilter)
+        cache = ResultCache(args.cache_dir, rules_fingerprint(ruletables, settings), args.cache_size * 1024 * 1024)
+
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    writer = create_writer(args.format, sys.stdout, ruletables)
+    for filepath, findings, cached in scan_files(filelist, jobs, args.cautionary, args.posix, args.windows,
+                                                 args.engine, prefilter, cache, stats, options):
+        if stats is not None:
+            if cached:
+                stats.count("cached files")
+            elif findings is None:
+                stats.count("prefiltered files")
+            elif any(finding.category == LIMIT_CATEGORY and finding.identifier == "max-file-size" for finding in findings):
+                # Files over --max-file-size are either never read or only in part.
+                stats.count("oversized files skipped" if args.oversize == "skip" else "oversized files sampled")
+            else:
+                stats.count("tokenized files")
+
+        if findings is None:
+            continue
+
+        if args.changed_lines_only:
+            lines = changedlines.get(os.path.abspath(filepath), set())
+            if lines is not None:
+                findings = [finding for finding in findings if finding.linenumber in lines]
+
+        if stats is None:
+            writer.write_findings(findings)
+        else:
+            start, startcpu = time.perf_counter(), time.process_time()
+            writer.write_findings(findings)
+            stats.add_time("output", time.perf_counter() - start, time.process_time() - startcpu)
+            stats.count("findings", len(findings))
 
-    for file in filelist:
-        tokenize_file(file, args.cautionary, args.posix, args.windows)
+    writer.close()
+    if cache is not None:
+        cache.close()
+        print("Cache: %d hits, %d misses" % (cache.hits, cache.misses), file=sys.stderr)
+    if stats is not None:
+        stats.report(sys.stderr)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,7 @@
+# The modules behind deprecation-check.py, kept in a package of their own so their names can't clash
+# with modules of the process that imports them. The library interface is re-exported here:
+#
+#   from deprecation_check import Scanner
+
+from .rules import Finding
+from .scanner import LIMIT_CATEGORY, SOURCE_EXTENSIONS, Scanner, get_scanner
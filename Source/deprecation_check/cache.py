@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+
+# Bump this whenever the tokenizer or the cache layout changes in a way that alters results.
+CACHE_VERSION = 4
+
+
+# Fingerprint of everything besides the file contents that affects the findings of a file.
+# settings are any further options that change findings, as something that can be dumped to JSON.
+def rules_fingerprint(ruletables, settings=None):
+    hasher = hashlib.sha256()
+    hasher.update(json.dumps([CACHE_VERSION, ruletables, settings], sort_keys=True).encode("utf-8"))
+    return hasher.hexdigest()
+
+
+# On-disk cache of per-file findings, keyed by the hash of the file contents and the rule fingerprint.
+#
+# An index of (mtime, size, content hash) per path lets unchanged files skip hashing entirely.
+# Entries are stored one per file and evicted least recently used first once the cache grows
+# past maxsize bytes, which the index counts toward as well. Once it does, index rows of files that
+# no longer exist are dropped, and if that isn't enough, those of files this run didn't look at.
+class ResultCache:
+    def __init__(self, directory, fingerprint, maxsize):
+        self._directory = directory
+        self._entrydir = os.path.join(directory, "entries")
+        self._indexpath = os.path.join(directory, "index.json")
+        self._fingerprint = fingerprint
+        self._maxsize = maxsize
+        self._filehashes = {}
+        self._seen = set()
+        self._index_changed = False
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self._entrydir, exist_ok=True)
+        try:
+            with open(self._indexpath) as indexfile:
+                self._index = json.load(indexfile)
+        except (OSError, ValueError):
+            self._index = {}
+
+    def __str__(self):
+        return "ResultCache - %s" % self._directory
+
+    def __repr__(self):
+        return "ResultCache - %s" % self._directory
+
+    def _content_hash(self, filepath):
+        stat = os.stat(filepath)
+        key = os.path.abspath(filepath)
+        self._seen.add(key)
+        indexed = self._index.get(key)
+        if indexed is not None and indexed[0] == stat.st_mtime_ns and indexed[1] == stat.st_size:
+            return indexed[2]
+
+        hasher = hashlib.sha256()
+        with open(filepath, "rb") as sourcefile:
+            for block in iter(lambda: sourcefile.read(1 << 20), b""):
+                hasher.update(block)
+
+        contenthash = hasher.hexdigest()
+        self._index[key] = [stat.st_mtime_ns, stat.st_size, contenthash]
+        self._index_changed = True
+        return contenthash
+
+    def _entry_path(self, filepath):
+        contenthash = self._filehashes.get(filepath)
+        if contenthash is None:
+            contenthash = self._content_hash(filepath)
+            self._filehashes[filepath] = contenthash
+
+        entryname = hashlib.sha256((self._fingerprint + contenthash).encode("ascii")).hexdigest()
+        return os.path.join(self._entrydir, entryname + ".json")
+
+    # Returns the cached rows of a file, or None if the file isn't cached.
+    def get(self, filepath):
+        entrypath = self._entry_path(filepath)
+        try:
+            with open(entrypath) as entryfile:
+                entry = json.load(entryfile)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        os.utime(entrypath)  # Mark as recently used for eviction.
+        self.hits += 1
+        return entry
+
+    # Stores rows describing the findings of a file. They have to be serializable as JSON.
+    def put(self, filepath, rows):
+        entrypath = self._entry_path(filepath)
+        temppath = "%s.%d.tmp" % (entrypath, os.getpid())
+        with open(temppath, "w") as entryfile:
+            json.dump(rows, entryfile)
+        os.replace(temppath, entrypath)
+
+    def _index_size(self):
+        if self._index_changed:
+            return len(json.dumps(self._index))
+        try:
+            return os.path.getsize(self._indexpath)
+        except OSError:
+            return 0
+
+    # Drops index rows of files that no longer exist, as after renames, and then those of files this
+    # run didn't look at while the cache is still over its size limit.
+    def _prune_index(self, entrysize):
+        missing = [key for key in self._index if key not in self._seen and not os.path.exists(key)]
+        for key in missing:
+            del self._index[key]
+        self._index_changed = self._index_changed or bool(missing)
+
+        if entrysize + self._index_size() > self._maxsize and len(self._index) > len(self._seen):
+            self._index = {key: row for key, row in self._index.items() if key in self._seen}
+            self._index_changed = True
+
+    # Writes the index and evicts the least recently used entries while the cache is over its size limit.
+    def close(self):
+        entries = []
+        entrysize = 0
+        with os.scandir(self._entrydir) as scanner:
+            for entry in scanner:
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                entrysize += stat.st_size
+
+        if entrysize + self._index_size() > self._maxsize:
+            self._prune_index(entrysize)
+
+        if self._index_changed:
+            temppath = "%s.%d.tmp" % (self._indexpath, os.getpid())
+            with open(temppath, "w") as indexfile:
+                json.dump(self._index, indexfile)
+            os.replace(temppath, self._indexpath)
+            self._index_changed = False
+
+        totalsize = entrysize + self._index_size()
+        if totalsize <= self._maxsize:
+            return
+
+        entries.sort()
+        for mtime, size, path in entries:
+            if totalsize <= self._maxsize:
+                break
+            os.remove(path)
+            totalsize -= size
@@ -0,0 +1,57 @@
+import os
+import re
+import subprocess
+
+# Header of a hunk in a unified diff, capturing the start and length of the new side.
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+def _run_git(directory, *args):
+    result = subprocess.run(["git", "-C", directory, "-c", "core.quotePath=false"] + list(args),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    if result.returncode != 0:
+        raise RuntimeError("git %s failed: %s" % (" ".join(args), result.stderr.decode("utf-8", "replace").strip()))
+
+    return result.stdout.decode("utf-8", "surrogateescape")
+
+
+def get_toplevel(directory):
+    return _run_git(directory, "rev-parse", "--show-toplevel").strip()
+
+
+# Returns a dict mapping every file changed in the working tree since the given revision to the
+# set of line numbers touched on its new side. Untracked files are included and map to None,
+# since every line of them is new. Deleted files are left out, as there is nothing to scan.
+#
+# Paths come from --name-only -z, which gives them as they are, whatever the diff prefix settings
+# and however they would be quoted. Both commands list the files in the same order, so the hunks
+# after the n-th "diff --git" header belong to the n-th path.
+def get_changed_lines(directory, revision):
+    toplevel = get_toplevel(directory)
+    changes = {}
+    current = None
+
+    diffargs = ("--no-color", "--no-ext-diff", "--no-textconv", "--diff-filter=d", revision, "--")
+    paths = [path for path in _run_git(toplevel, "diff", "--name-only", "-z", *diffargs).split("\0") if path]
+    diff = _run_git(toplevel, "diff", "-U0", *diffargs)
+    fileidx = 0
+    for line in diff.split("\n"):
+        if line.startswith("diff --git ") or line.startswith("diff --cc "):
+            current = None
+            if fileidx < len(paths):
+                current = changes.setdefault(os.path.join(toplevel, paths[fileidx]), set())
+            fileidx += 1
+            continue
+
+        match = _HUNK_HEADER.match(line)
+        if match is not None and current is not None:
+            start = int(match.group(1))
+            length = 1 if match.group(2) is None else int(match.group(2))
+            current.update(range(start, start + length))
+
+    untracked = _run_git(toplevel, "ls-files", "--others", "--exclude-standard", "-z")
+    for path in untracked.split("\0"):
+        if path:
+            changes[os.path.join(toplevel, path)] = None
+
+    return changes
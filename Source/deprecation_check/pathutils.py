@@ -0,0 +1,125 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import translate
+
+# Directories that never contain anything worth checking.
+DEFAULT_EXCLUDES = (".git", ".hg", ".svn")
+
+
+# A set of .gitignore-style patterns. Patterns without a slash match the name of a file or
+# directory at any depth, patterns with one are matched against the path relative to the
+# directory being searched, and a trailing slash only matches directories. Negated
+# patterns aren't supported.
+class ExcludePatterns:
+    def __init__(self, patterns=DEFAULT_EXCLUDES):
+        self._patterns = []
+        self._matchers = None
+        for pattern in patterns:
+            self.add(pattern)
+
+    def __str__(self):
+        return "ExcludePatterns - %d patterns" % len(self._patterns)
+
+    def __repr__(self):
+        return "ExcludePatterns - %d patterns" % len(self._patterns)
+
+    def add(self, pattern):
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith(("#", "!")):
+            return
+
+        dironly = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        anchored = "/" in pattern
+        self._patterns.append((pattern.lstrip("/"), anchored, dironly))
+        self._matchers = None
+
+    def add_from_file(self, filepath):
+        with open(filepath) as patternfile:
+            for line in patternfile:
+                self.add(line)
+
+    # Folds the patterns into one regex per kind of match, so checking a path is a single match call.
+    def _compile(self):
+        def combine(patterns):
+            if not patterns:
+                return None
+            return re.compile("|".join(translate(pattern) for pattern in patterns)).match
+
+        self._matchers = (
+            combine([pattern for pattern, anchored, dironly in self._patterns if not anchored and not dironly]),
+            combine([pattern for pattern, anchored, dironly in self._patterns if anchored and not dironly]),
+            combine([pattern for pattern, anchored, dironly in self._patterns if not anchored]),
+            combine([pattern for pattern, anchored, dironly in self._patterns if anchored]),
+        )
+
+    def excluded(self, relpath, name, isdir):
+        if self._matchers is None:
+            self._compile()
+
+        matchname, matchpath = self._matchers[2:] if isdir else self._matchers[:2]
+        return (matchname is not None and matchname(name) is not None) or \
+               (matchpath is not None and matchpath(relpath) is not None)
+
+
+# Lists a directory, returning the sorted names of its subdirectories and other entries.
+# Like os.walk, symlinks to directories aren't descended into and unreadable directories are skipped.
+def _scan_dir(directory):
+    dirnames = []
+    filenames = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    isdir = entry.is_dir() and not entry.is_symlink()
+                except OSError:
+                    isdir = False
+
+                if isdir:
+                    dirnames.append(entry.name)
+                else:
+                    filenames.append(entry.name)
+    except OSError:
+        pass
+
+    dirnames.sort()
+    filenames.sort()
+    return dirnames, filenames
+
+
+# Yields source files from a given directory that match any of the extensions passed in, while the
+# search is still going. Directories are listed ahead of time by a pool of threads, which hides the
+# latency of network file systems, but files are always yielded in the same sorted depth-first order.
+# Excluded directories are never descended into.
+def iter_files_from_dir(directory, extensions, recursive, excludes=None, threads=8):
+    executor = ThreadPoolExecutor(max_workers=threads)
+    try:
+        pending = [("", directory, executor.submit(_scan_dir, directory))]
+        while pending:
+            reldir, dirpath, future = pending.pop()
+            dirnames, filenames = future.result()
+
+            for name in filenames:
+                if name.endswith(extensions):
+                    relpath = reldir + name
+                    if excludes is None or not excludes.excluded(relpath, name, False):
+                        yield os.path.join(dirpath, name)
+
+            if not recursive:
+                break
+
+            subdirs = []
+            for name in dirnames:
+                relpath = reldir + name
+                if excludes is None or not excludes.excluded(relpath, name, True):
+                    subdir = os.path.join(dirpath, name)
+                    subdirs.append((relpath + "/", subdir, executor.submit(_scan_dir, subdir)))
+            pending.extend(reversed(subdirs))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Gets source files from a given directory that match any of the extensions passed in.
+def get_files_from_dir(directory, extensions, recursive, excludes=None):
+    return list(iter_files_from_dir(directory, extensions, recursive, excludes))
@@ -0,0 +1,223 @@
+# A small subset of the C preprocessor, enough to skip code that is never compiled and to find the
+# headers of a project through its compile_commands.json.
+#
+# Conditionals are only evaluated when the answer is certain: literal numbers, and names given with
+# -D or -U. Any other condition keeps every branch, since it depends on a configuration this tool
+# doesn't know about.
+
+import json
+import os
+import re
+import shlex
+
+from .tokenizer import map_source
+
+# Conditional directives, with the rest of their line.
+_CONDITIONAL = re.compile(rb"^[ \t]*#[ \t]*(if|ifdef|ifndef|elif|else|endif)\b([^\n]*)", re.M)
+
+# Include directives, with the kind of quote and the included path.
+_INCLUDE = re.compile(rb'^[ \t]*#[ \t]*include[ \t]*([<"])([^>"\n]+)[>"]', re.M)
+
+# Comments at the end of a directive.
+_TRAILING_COMMENT = re.compile(rb"/\*.*?\*/|//.*")
+
+_NAME = re.compile(rb"[A-Za-z_][A-Za-z0-9_]*")
+_DEFINED = re.compile(rb"defined[ \t]*(?:\([ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*\)|([A-Za-z_][A-Za-z0-9_]*))")
+_NUMBER = re.compile(rb"(0[xX][0-9A-Fa-f]+|[0-9]+)[uUlL]*")
+
+# Turns every byte but newlines into a space, so blanked code keeps its line numbers and columns.
+_BLANK = bytes(10 if byte == 10 else 32 for byte in range(256))
+
+
+# Parses -D style NAME or NAME=VALUE strings into a {name: value} dict, with names alone being 1.
+def parse_defines(defines):
+    parsed = {}
+    for define in defines:
+        name, _, value = define.partition("=")
+        parsed[name.strip().encode("ascii")] = value.strip().encode("ascii") if value else b"1"
+    return parsed
+
+
+# Parses an integer literal as the preprocessor sees it, or returns None for anything else.
+def _number(text):
+    match = _NUMBER.fullmatch(text)
+    if match is None:
+        return None
+
+    digits = match.group(1)
+    try:
+        if digits[:2] in (b"0x", b"0X"):
+            return int(digits[2:], 16)
+        return int(digits, 8 if digits.startswith(b"0") else 10)
+    except ValueError:
+        return None
+
+
+# Evaluates a conditional to True or False, or None if it can't be known.
+def _evaluate(directive, condition, defines, undefines):
+    condition = _TRAILING_COMMENT.sub(b" ", condition).strip()
+    if directive in (b"ifdef", b"ifndef"):
+        if _NAME.fullmatch(condition) is None:
+            return None
+        if condition in defines:
+            value = True
+        elif condition in undefines:
+            value = False
+        else:
+            return None
+        return value if directive == b"ifdef" else not value
+
+    negate = False
+    while condition.startswith(b"!"):
+        negate = not negate
+        condition = condition[1:].strip()
+    while condition.startswith(b"(") and condition.endswith(b")"):
+        condition = condition[1:-1].strip()
+
+    value = None
+    defined = _DEFINED.fullmatch(condition)
+    if defined is not None:
+        name = defined.group(1) or defined.group(2)
+        if name in defines:
+            value = True
+        elif name in undefines:
+            value = False
+    elif _NAME.fullmatch(condition) is not None:
+        if condition in defines:
+            number = _number(defines[condition])
+            value = None if number is None else number != 0
+        elif condition in undefines:
+            value = False
+    else:
+        number = _number(condition)
+        value = None if number is None else number != 0
+
+    if value is None:
+        return None
+    return not value if negate else value
+
+
+# Returns data with the lines of every branch that is never compiled turned into whitespace, such as
+# the body of #if 0. The directives themselves are kept. defines is a dict from parse_defines, and
+# undefines a collection of names given with -U, both as bytes. Data without any disabled code is
+# returned as it is.
+def blank_disabled(data, defines=None, undefines=()):
+    defines = defines or {}
+    # Each open conditional is [enclosing branch active, a branch known to be true was taken].
+    stack = []
+    active = True
+    disabledfrom = None
+    spans = []
+    for match in _CONDITIONAL.finditer(data):
+        directive = match.group(1)
+        if directive in (b"if", b"ifdef", b"ifndef"):
+            stack.append([active, False])
+            value = _evaluate(directive, match.group(2), defines, undefines)
+        elif not stack:
+            continue  # Unbalanced, leave it to the compiler.
+        elif directive == b"endif":
+            nowactive = stack.pop()[0]
+        elif directive == b"else":
+            value = not stack[-1][1]
+        else:
+            value = False if stack[-1][1] else _evaluate(b"if", match.group(2), defines, undefines)
+
+        if directive != b"endif":
+            if value:
+                stack[-1][1] = True
+            nowactive = stack[-1][0] and value is not False
+
+        if active and not nowactive:
+            disabledfrom = match.end()
+        elif not active and nowactive:
+            spans.append((disabledfrom, match.start()))
+        active = nowactive
+
+    if not active:
+        spans.append((disabledfrom, len(data)))
+    if not spans:
+        return data
+
+    pieces = []
+    pos = 0
+    for start, end in spans:
+        pieces.append(data[pos:start])
+        pieces.append(data[start:end].translate(_BLANK))
+        pos = end
+    pieces.append(data[pos:])
+    return b"".join(pieces)
+
+
+# Reads a compile_commands.json and returns (file, quote include dirs, include dirs) per translation unit.
+def load_compile_commands(filepath):
+    with open(filepath) as commandsfile:
+        commands = json.load(commandsfile)
+
+    units = []
+    for command in commands:
+        directory = command.get("directory", os.path.dirname(os.path.abspath(filepath)))
+        arguments = command.get("arguments") or shlex.split(command.get("command", ""))
+        quotedirs = []
+        includedirs = []
+        idx = 0
+        while idx < len(arguments):
+            argument = arguments[idx]
+            for flag, dirs in (("-iquote", quotedirs), ("-isystem", includedirs), ("-I", includedirs)):
+                if argument.startswith(flag):
+                    value = argument[len(flag):]
+                    if not value and idx + 1 < len(arguments):
+                        idx += 1
+                        value = arguments[idx]
+                    if value:
+                        dirs.append(os.path.normpath(os.path.join(directory, value)))
+                    break
+            idx += 1
+
+        units.append((os.path.normpath(os.path.join(directory, command["file"])), quotedirs, includedirs))
+    return units
+
+
+def _resolve_include(name, quoted, currentdir, quotedirs, includedirs):
+    searchdirs = ([currentdir] + quotedirs if quoted else []) + includedirs
+    for directory in searchdirs:
+        candidate = os.path.join(directory, name)
+        if os.path.isfile(candidate):
+            return os.path.normpath(candidate)
+    return None
+
+
+# Yields every translation unit from load_compile_commands with one of the extensions, followed by
+# the headers it includes that can be found in its include directories, recursively. Every file is
+# yielded only once over all translation units, however many of them include it. Headers that can't
+# be found, like those of the system, are left out. With preprocess set, includes in disabled code
+# are ignored, with defines and undefines being -D and -U style strings as for Scanner.
+def iter_compile_commands_files(units, extensions, preprocess=False, defines=(), undefines=()):
+    defines = parse_defines(defines)
+    undefines = frozenset(name.encode("ascii") for name in undefines)
+    seen = set()
+    for unit, quotedirs, includedirs in units:
+        if not unit.endswith(extensions) or os.path.realpath(unit) in seen or not os.path.isfile(unit):
+            continue
+
+        seen.add(os.path.realpath(unit))
+        pending = [unit]
+        while pending:
+            current = pending.pop()
+            yield current
+
+            try:
+                with map_source(current) as data:
+                    if preprocess:
+                        data = blank_disabled(data, defines, undefines)
+                    includes = [(match.group(1) == b'"', os.fsdecode(match.group(2).strip()))
+                                for match in _INCLUDE.finditer(data)]
+            except OSError:
+                continue
+
+            headers = []
+            for quoted, name in includes:
+                header = _resolve_include(name, quoted, os.path.dirname(current), quotedirs, includedirs)
+                if header is not None and os.path.realpath(header) not in seen:
+                    seen.add(os.path.realpath(header))
+                    headers.append(header)
+            pending.extend(reversed(headers))
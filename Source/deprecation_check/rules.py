@@ -0,0 +1,369 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
+
+# C/C++ standard library
+deprecatedDict = {
+    "auto_ptr"                   : "auto_ptr is deprecated as of C++11. Consider using std::shared_ptr or std::unique_ptr.",
+    "binary_function"            : "binary_function is deprecated as of C++11. Consider using std::function instead.",
+    "binder1st"                  : "binder1st is deprecated as of C++11. Consider using std::bind instead.",
+    "binder2nd"                  : "binder2nd is deprecated as of C++11. Consider using std::bind instead.",
+    "bind1st"                    : "bind1st is deprecated as of C++11. Consider using std::bind instead.",
+    "bind2nd"                    : "bind2nd is deprecated as of C++11. Consider using std::bind instead.",
+    "CLK_TCK"                    : "CLK_TCK is deprecated. Consider using CLOCKS_PER_SEC instead.",
+    "const_mem_fun_t"            : "const_mem_fun_t is deprecated as of C++11.",
+    "const_mem_fun1_t"           : "const_mem_fun1_t is deprecated as of C++11.",
+    "const_mem_fun_ref_t"        : "const_mem_fun_ref_t is deprecated as of C++11.",
+    "const_mem_fun1_ref_t"       : "const_mem_fun1_ref_t is deprecated as of C++11.",
+    "get_unexpected"             : "get_unexpected is deprecated as of C++11. Consider using noexcept instead.",
+    "gets"                       : "gets is removed in the C11 and C++11 standards.",
+    "istrstream"                 : "istrstream is deprecated as of C++11. Consider using std::istringstream instead.",
+    "mem_fun"                    : "mem_fun is deprecated as of C++11. Consider using std::mem_fn instead.",
+    "mem_fun_ref"                : "mem_fun_ref is deprecated as of C++11. Consider std::mem_fn instead.",
+    "mem_fun_ref_t"              : "mem_fun_ref_t is deprecated as of C++11.",
+    "mem_fun1_ref_t"             : "mem_fun1_ref_t is deprecated as of C++11.",
+    "mem_fun_t"                  : "mem_fun_t is deprecated as of C++11.",
+    "mem_fun1_t"                 : "mem_fun1_t is deprecated as of C++11.",
+    "ostrstream"                 : "ostrstream is deprecated as of C++11. Consider using std::ostringstream instead.",
+    "pointer_to_binary_function" : "pointer_to_binary_function is deprecated as of C++11. Consider using std::bind or std::function instead.",
+    "pointer_to_unary_function"  : "pointer_to_unary_function is deprecated as of C++11. Consider using std::bind or std::function instead.",
+    "ptr_fun"                    : "ptr_fun is deprecated as of C++11. Consider using std::function or std::ref instead.",
+    "random_shuffle"             : "random_shuffle is deprecated as of C++14. Consider using std::shuffle instead.",
+    "set_unexpected"             : "set_unexpected is deprecated as of C++11. Consider using noexcept instead.",
+    "strstream"                  : "strstream is deprecated as of C++11. Consider using std::stringstream instead.",
+    "strstreambuf"               : "strstreambuf is deprecated as of C++11. Consider using std::stringstream instead.",
+    "unary_function"             : "unary_function is deprecated as of C++11. Consider using std::function instead.",
+    "unexpected"                 : "unexpected is deprecated as of C++11.",
+    "unexpected_handler"         : "unexpected_handler is deprecated as of C++11.",
+}
+
+# Functions that likely have better alternatives
+cautionaryDict = {
+    "alloca" : "alloca can be a dangerous function to use.\nIf the allocation attempt by alloca causes a stack overflow, then behavior is undefined.\nConsider using malloc, new, an STL container, or a smart pointer.",
+    "itoa"   : "itoa is not a standardized library function.\nConsider using snprintf instead.",
+    "rand"   : "Use of rand is not recommended. Consider using the functionality provided in the <random> header instead.",
+    "scanf"  : "scanf can be a dangerous function to use.\nIt is more difficult to ensure the receiving buffer won't overflow. Consider using sscanf instead.",
+    "srand"  : "Use of srand is not recommended. Consider using the functionality provided in the <random> header instead.",
+}
+
+# POSIX API-related warnings
+posixDict = {
+    "bcmp"                      : "bcmp is a POSIX legacy function, and is removed as of POSIX.1-2008. Consider using memcmp instead.",
+    "bcopy"                     : "bcopy is a POSIX legacy function, and is removed as of POSIX.1-2008. Consider using memcpy instead.",
+    "bzero"                     : "bzero is a POSIX legacy function, and is removed as of POSIX.1-2008. Consider using memset instead.",
+    "cuserid"                   : "cuserid is a POSIX legacy function and is removed as of POSIX.1-2001. Consider replacing it with getpwuid(geteuid()).",
+    "ecvt"                      : "ecvt is a POSIX legacy function. Consider using std::to_string or snprintf instead.",
+    "fcvt"                      : "fcvt is a POSIX legacy function. Consider using std::to_string or snprintf instead.",
+    "ftime"                     : "ftime is a POSIX legacy function. Consider using functions provided by the chrono header in C++11 instead.",
+    "gcvt"                      : "gcvt is a POSIX legacy function. Consider using std::to_string or snprintf instead.",
+    "gethostbyaddr"             : "gethostbyaddr has been obsoleted in POSIX 1003.1. Consider using getaddrinfo instead.",
+    "gethostbyname"             : "gethostbyname has been obsoleted in POSIX 1003.1. Consider using getnameinfo instead.",
+    "getwd"                     : "getwd is a POSIX legacy function. Consider using getcwd instead.",
+    "inet_addr"                 : "inet_addr is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
+    "inet_aton"                 : "inet_aton is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
+    "inet_lnaof"                : "inet_lnaof is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
+    "inet_makeaddr"             : "inet_makeaddr is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
+    "inet_netof"                : "inet_netof is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
+    "inet_network"              : "inet_network is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
+    "inet_nsap_addr"            : "inet_nsap_addr is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
+    "inet_nsap_ntoa"            : "inet_nsap_ntoa is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
+    "inet_ntoa"                 : "inet_ntoa is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
+    "inet_ntop"                 : "inet_ntop is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
+    "inet_pton"                 : "inet_pton is a POSIX legacy function. Consider using getnameinfo or getaddrinfo instead.",
+    "mktemp"                    : "mktemp is a POSIX legacy function. Consider using mkstemp instead, or investigate a cross platform solution.",
+    "utimes"                    : "utimes is a POSIX legacy function. Consider using utime instead.",
+    "wcswcs"                    : "wcswcs is a POSIX legacy function. Consider using wcsstr or std::wstring instead.",
+}
+
+# Windows API-related warnings
+windowsDict = {
+    "AddMRUStringW"                      : "AddMRUStringW is deprecated as of Windows Vista.",
+    "AppendMenuWrapW"                    : "AppendMenuWrapW should not be used. Consider using AppendMenuW instead.",
+    "CallCPLEntry16"                     : "CallCPLEntry16 is removed as of Windows Vista.",
+    "CallWindowProcWrapW"                : "CallWindowProcWrapW should not be used. Consider using CallWindowProcW instead.",
+    "CanShareFolderW"                    : "CanShareFolderW is deprecated as of Windows Vista.",
+    "ChangeWindowMessageFilter"          : "Using ChangeWindowMessageFilter is not recommended. It is recommended that ChangeWindowMessageFilterEx be used instead.",
+    "CharLowerWrapW"                     : "CharLowerWrapW should not be used. Consider using CharLowerW instead.",
+    "CharUpperWrapW"                     : "CharUpperWrapW should not be used. Consider using CharUpperW instead.",
+    "CharUpperBuffWrapW"                 : "CharUpperBuffWrapW should not be used. Consider using CharUpperBuff instead.",
+    "CIDLData_CreateFromIDArray"         : "CIDLData_CreateFromIDArray is removed as of Windows Vista.",
+    "CompareStringWrapW"                 : "CompareStringWrapW should not be used. Consider using CompareStringEx instead.",
+    "CopyFileWrapW"                      : "CopyFileWrapW should not be used. Consider using CopyFile instead.",
+    "ConnectToConnectionPoint"           : "ConnectToConnectionPoint is deprecated as of Windows Vista.",
+    "CreateEventWrapW"                   : "CreateEventWrapW should not be used. Consider using CreateEvent or CreateEventEx instead.",
+    "CreateFileWrapW"                    : "CreateFileWrapW should not be used. Consider using CreateFile instead.",
+    "CreateHardwareMoniker"              : "CreateHardwareMoniker is deprecated as of Windows Vista.",
+    "CreateUserProfileEx"                : "CreateUserProfileEx has been removed in Windows Vista.",
+    "CreateWindowExWrapW"                : "CreateWindowExWrapW should not be used. Consider using CreateWindowEx instead.",
+    "CscSearchApiGetInterface"           : "CscSearchApiGetInterface is deprecated as of Windows 7.",
+    "DAD_AutoScroll"                     : "DAD_AutoScroll is deprecated as of Windows Vista.",
+    "DAD_DragEnterEx"                    : "DAD_DragEnterEx is deprecated as of Windows Vista. Consider using ImageList_DragEnter instead.",
+    "DAD_DragEnterEx2"                   : "DAD_DragEnterEx2 is deprecated as of Windows Vista. Consider using ImageList_DragEnter instead.",
+    "DAD_DragLeave"                      : "DAD_DragLeave is deprecated as of Windows Vista. Consider using ImageList_DragLeave instead.",
+    "DAD_DragMove"                       : "DAD_DragMove is deprecated as of Windows Vista. Consider using ImageList_DragMove instead.",
+    "DAD_SetDragImage"                   : "DAD_SetDragImage is deprecated as of Windows Vista. Consider using ImageList_BeginDrag instead.",
+    "DAD_ShowDragImage"                  : "DAD_ShowDragImage is deprecated as of Windows Vista. Consider using ImageList_DragShowNoLock instead.",
+    "DoEnvironmentSubst"                 : "DoEnvironmentSubst is deprecated as of Windows Vista. Consider using ExpandEnvironmentStrings instead.",
+    "DefWindowProcWrapW"                 : "DefWindowProcWrapW should not be used. Consider using DefWindowProc instead.",
+    "DeleteFileWrapW"                    : "DeleteFileWrapW should not be used. Consider using DeleteFile instead.",
+    "DialogBoxParamWrapW "               : "DialogBoxParamWrapW should not be used. Consider using DialogBoxParam instead.",
+    "DispatchMessageWrapW"               : "DispatchMessage should not be used. Consider using DispatchMessage instead.",
+    "DragQueryFileWrapW"                 : "DragQueryFileWrapW should not be used. Consider using DragQueryFile instead.",
+    "DrawTextExWrapW"                    : "DrawTextExWrapW should not be used. Consider using DrawTextEx instead.",
+    "DrawTextWrapW"                      : "DrawTextWrapW should not be used. Consider using DrawText instead.",
+    "DriveType"                          : "DriveType is deprecated as of Windows Vista. Consider using GetDriveType in the Volume Management API instead.",
+    "DwmEnableComposition"               : "DwmEnableComposition is deprecated as of Windows 8. DWM can no longer be programmatically disabled.",
+    "DwmModifyPreviousDxFrameDuration"   : "DwmModifyPreviousDxFrameDuration is no longer supported starting with Windows 8.1.",
+    "DwmSetDxFrameDuration"              : "DwmSetDxFrameDuration is no longer supported starting with Windows 8.1.",
+    "DwmSetPresentParameters"            : "DwmSetPresentParameters is no longer supported starting with Windows 8.1.",
+    "EnumMRUListW"                       : "EnumMRUListW is deprecated as of Windows Vista.",
+    "EstimateFileRisk"                   : "EstimateFileRisk is deprecated as of Windows Vista. IAttachmentExecute should be used instead.",
+    "ExtractAssociatedIconEx"            : "ExtractAssociatedEx is deprecated.",
+    "ExtTextOutWrapW"                    : "ExtTextOutWrapW should not be used. Consider using ExtTextOut instead.",
+    "FindResourceWrapW"                  : "FindResourceWrapW should not be used. Consider using FindResourceW instead.",
+    "FormatMessageWrapW"                 : "FormatMessageWrapW should not be used. Consider using FormatMessage instead.",
+    "GetClassInfo"                       : "GetClassInfo has been superseded by GetClassInfoEx. Consider using it instead.",
+    "GetClassInfoWrapW"                  : "GetClassInfoWrapW should not be used. Consider using GetClassInfoEx instead.",
+    "GetClassLong"                       : "GetClassLong has been superseded by GetClassLongPtr. Consider using it instead to have 32-bit and 64-bit compatible code.",
+    "GetClassWord"                       : "GetClassWord is a compatibility function for 16-bit versions of Windows. Strongly consider using GetClassLongPtr instead.",
+    "GetDateFormatWrapW"                 : "GetDateFormatWrapW should not be used. Consider using GetDateFormatEx instead.",
+    "GetDlgItemTextWrapW"                : "GetDlgItemTextWrapW should not be used. Consider using GetDlgItemTextWrapW instead.",
+    "GetFileAttributesWrapW"             : "GetFileAttributesWrapW should not be used. Consider using GetFileAttributes or GetFileAttributesEx instead.",
+    "GetFileNameFromBrowse"              : "GetFileNameFromBrowse is deprecated as of Windows Vista.",
+    "GetLocaleInfoWrapW"                 : "GetLocaleWrapW should not be used. Consider using GetLocalInfoEx instead.",
+    "GetMenuItemInfoWrapW"               : "GetMenuItemInfoWrapW should not be used. Consider using GetMenuItemInfo instead",
+    "GetMenuPosFromID"                   : "GetMenuPosFromID is deprecated.",
+    "GetModuleFileNameWrapW"             : "GetModuleFileNameWrapW should not be used. Consider using GetModuleFileName or GetModuleFileNameEx instead.",
+    "GetModuleHandleWrapW"               : "GetModuleHandleWrapW should not be used. Consider using GetModuleHandle or GetModuleHandleEx instead.",
+    "GetObjectWrapW"                     : "GetObjectWrapW should not be used. Consider using GetObject instead.",
+    "GetOpenFileName"                    : "GetOpenFileName has been superseded by the Common Item Dialog in Windows Vista. Consider using it instead.",
+    "GetOpenFileNameWrapW"               : "GetOpenFileNameWrapW should not be used. Consider using the Common Item Dialog instead.",
+    "GetSaveFileName"                    : "GetSaveFileName has been superseded by the Common Item Dialog in Windows Vista. Consider using it instead.",
+    "GetSaveFileNameWrapW"               : "GetSaveFileNameWrapW should not be used. Consider using the Common Item Dialog instead.",
+    "GetSystemDirectoryWrapW"            : "GetSystemDirectoryWrapW should not be used. Consider using GetSystemDirectory instead.",
+    "GetTimeFormatWrapW"                 : "GetTimeFormatWrapW should not be used. Consider using GetTimeFormatW instead.",
+    "GetVersionEx"                       : "GetVersionEx is deprecated as of Windows 8.1. Consider using the Version Helper API functions instead.",
+    "GetWindowLong"                      : "GetWindowLong has been superseded by GetWindowLongPtr. Consider using it instead to have 32-bit and 64-bit compatible code.",
+    "GetWindowLongWrapW"                 : "GetWindowLongWrapW should not be used. Consider using GetWindowLong, or GetWindowLongPtr if a handle is being retrieved.",
+    "GetWindowsDirectoryWrapW"           : "GetWindowsDirectoryWrapW should not be used. Consider using GetWindowsDirectory instead.",
+    "GetWindowTextLengthWrapW"           : "GetWindowTextLengthWrapW should not be used. Consider using GetWindowTextLength instead.",
+    "GetWindowTextWrapW"                 : "GetWindowTextWrapW should not be used. Consider using GetWindowText instead.",
+    "GUIDFromString"                     : "GUIDFromString has been deprecated as of Windows Vista. Consider using CLSIDFromString or IIDFromString instead.",
+    "ILLoadFromStream"                   : "ILLoadFromStream is deprecated as of Windows Vista.",
+    "InsertMenuItemWrapW"                : "InsertMenuItemWrapW should not be used. Consider using InsertMenuItem instead.",
+    "IsCharAlphaWrapW"                   : "IsCharAlphaWrapW should not be used. Consider using IsCharAlpha instead.",
+    "IsCharAlphaNumericWrapW"            : "IsCharAlphaNumericWrapW should not be used. Consider using IsCharAlphaNumeric instead.",
+    "IsCharUpperWrapW"                   : "IsCharUpperWrapW should not be used. Consider using IsCharUpper instead.",
+    "IsNetDrive"                         : "IsNetDrive is deprecated as of Windows Vista. Consider using GetDriveType in the Volume Management API, or WNetGetConnection in the Networking API instead.",
+    "IsUserAnAdmin"                      : "IsUserAnAdmin is deprecated as of Windows Vista.",
+    "LinkWindow_RegisterClass"           : "LinkWindow_Register class is deprecated as of Windows Vista. Consider using InitCommonControlsEx instead.",
+    "LinkWindow_UnregisterClass"         : "LinkWindow_Register class is deprecated as of Windows Vista.",
+    "LoadLibraryWrapW"                   : "LoadLibraryWrapW should not be used. Consider using LoadLibrary or LoadLibraryEx instead.",
+    "LoadStringWrapW"                    : "LoadStringWrapW should not be used. Consider using LoadString instead.",
+    "MessageBoxWrapW"                    : "MessageBoxWrapW should not be used. Consider using MessageBox instead.",
+    "MoveFileWrapW"                      : "MoveFileWrapW should not be used. Consider using MoveFile, MoveFileEx, MoveFileWithProgress, or MoveFileTransacted instead.",
+    "MLFreeLibrary"                      : "MLFreeLibrary is removed as of Windows 7.",
+    "MLHtmlHelp"                         : "MLHtmlHelp is deprecated as of Windows Vista.",
+    "MLLoadLibrary"                      : "MLLoadLibrary is removed as of Windows 7.",
+    "MLWinHelp"                          : "MLWinHelp is deprecated as of Windows Vista.",
+    "OFNHookProc"                        : "OFNHookProc is deprecated as of Windows Vista. Consider using the Common Item Dialog instead.",
+    "OFNHookProcOldStyle"                : "OFNHookProcOldStyle is deprecated as of Windows Vista. Consider using the Common Item Dialog instead.",
+    "OpenRegStream"                      : "OpenRegStream is deprecated as of Windows Vista. Consider using SHOpenRegStream2 instead.",
+    "OutputDebugStringWrapW"             : "OutputDebugStringWrapW is deprecated as of Windows Vista. Consider using OutputDebugStringW instead.",
+    "PassportWizardRunDll"               : "PassportWizardRunDll is deprecated as of Windows Vista.",
+    "PathCleanupSpec"                    : "PathCleanupSpec is deprecated as of Windows Vista.",
+    "PathGetShortPath"                   : "PathGetShortPath is deprecated as of Windows Vista.",
+    "PathIsExe"                          : "PathIsExe is deprecated as of Windows Vista.",
+    "PathIsSlow"                         : "PathIsSlow is deprecated as of Windows Vista.",
+    "PathProcessCommand"                 : "PathProcessCommand is deprecated as of Windows Vista.",
+    "PathResolve"                        : "PathResolve is deprecated as of Windows Vista.",
+    "PeekMessageWrapW"                   : "PeekMessageWrapW should not be used. Consider using PeekMessage instead.",
+    "PerUserInit"                        : "PerUserInit is deprecated as of Windows Vista.",
+    "PickIconDlg"                        : "PickIconDlg is deprecated as of Windows Vista.",
+    "PostMessageWrapW"                   : "PostMessageWrapW should not be used. Consider PostMessage or PostThreadMessage instead.",
+    "PrintDlg"                           : "PrintDlg is deprecated as of Windows XP. Consider using PrintDlgEx or PageSetupDlg instead.",
+    "ReadCabinetState"                   : "ReadCabinetState is deprecated as of Windows Vista.",
+    "RealDriveType"                      : "RealDriveType is deprecated as of Windows Vista. Consider using GetDriveType in the Volume Management API instead.",
+    "RegCreateKeyExWrapW"                : "RegCreateKeyExWrapW should not be used. Consider using RegCreateKeyEx or RegCreateKeyTransacted instead.",
+    "RegisterClass"                      : "RegisterClass has been superseded by RegisterClassEx. Consider using it instead.",
+    "RegisterClassWrapW"                 : "RegisterClassWrapW should not be used. Consider using RegisterClassEx instead.",
+    "RegOpenKeyExWrapW"                  : "RegOpenKeyExWrapW should not be used. Consider using RegOpenKeyEx or RegOpenKeyTransacted instead.",
+    "RegQueryValue"                      : "RegQueryValue has been superseded by RegQueryValueEx. Consider using it instead.",
+    "RegQueryValueExWrapW"               : "RegQueryValueExWrapW should not be used. Consider using RegQueryValueEx instead.",
+    "RegSetValueExWrapW"                 : "RegSetValueExWrapW should not be used. Consider using RegSetValueEx instead.",
+    "RestartDialog"                      : "RestartDialog is deprecated in Windows Vista. Consider using ExitWindowsEx instead.",
+    "RestartDialogEx"                    : "RestartDialogEx is deprecated in Windows Vista. Consider using ExitWindowsEx instead.",
+    "SendMessageWrapW"                   : "SendMessageWrapW should not be used. Consider using SendMessage instead.",
+    "SetClassLong"                       : "GetClassLong has been superseded by GetClassLongPtr. Consider using it instead to have 32-bit and 64-bit compatible code.",
+    "SetClassWord"                       : "SetClassWord is a compatibility function for 16-bit versions of Windows. Strongly consider using SetClassLongPtr instead.",
+    "SetDlgItemTextWrapW"                : "SetDlgItemTextWrapW should not be used. Consider using SetDlgItemText instead.",
+    "SetWindowLong"                      : "SetWindowLong has been superseded by SetWindowLongPtr. Consider using it instead to have 32-bit and 64-bit compatible code.",
+    "SetWindowLongWrapW"                 : "SetWindowLongWrapW should not be used. Consider using SetWindowLong, or SetWindowLongPtr if a handle is being set instead.",
+    "SetWindowTextWrapW"                 : "SetWindowTextWrapW should not be used. Consider using SetWindowText instead.",
+    "ShellExecuteExWrapW"                : "ShellExecuteExWrapW should not be used. Consider using ShellExecuteEx instead.",
+    "ShellMessageBoxWrapW"               : "ShellMessageBoxWrapW should not be used. Consider using ShellMessageBox instead.",
+    "SHAddFromPropSheetExtArray"         : "SHAddFromPropSheetExtArray is deprecated as of Windows Vista.",
+    "SHAlloc"                            : "SHAlloc is deprecated as of Windows Vista. Consider using CoTaskMemAllocInstead,",
+    "SHAllocShared"                      : "SHAllocShared is deprecated as of Windows Vista.",
+    "SHAnsiToAnsi"                       : "SHAnsiToAnsi is deprecated as of Windows Vista.",
+    "SHAnsiToUnicode"                    : "SHAnsiToUnicode is deprecated as of Windows Vista.",
+    "SHCloneSpecialIDList"               : "SHCloneSpecialIDList is deprecated as of Windows Vista. Consider using SHGetSpecialFolderLocation instead.",
+    "SHCLSIDFromString"                  : "SHCLSIDFromString is deprecated as of Windows Vista. Consider using CLSIDFromString instead.",
+    "SHCoCreateInstance"                 : "SHCoCreateInstance is deprecated as of Windows Vista. Consider using CoCreateInstanceInstead.",
+    "SHCreateDirectory"                  : "SHCreateDirectory is deprecated as of Windows Vista.",
+    "SHCreateDirectoryEx"                : "SHCreateDirectoryEx is deprecated as of Windows Vista.",
+    "SHCreateFileExtractIcon"            : "SHCreateFileExtractIcon is deprecated as of Windows Vista.",
+    "SHCreateProcessAsUserW"             : "SHCreateProcessAsUserW is removed as of Windows Vista.",
+    "SHCreatePropSheetExtArray"          : "SHCreatePropSheetExtArray is deprecated as of Windows Vista.",
+    "SHCreateQueryCancelAutoPlayMoniker" : "SHCreateQueryCancelAutoPlayMoniker is deprecated as of Windows Vista. Consider using CreateClassMoniker instead.",
+    "SHCreateStdEnumFmtEtc"              : "SHCreateStdEnumFmtEtc is deprecated as of Windows Vista.",
+    "SHCreateStreamOnFile"               : "SHCreateStreamOnFile is deprecated as of Windows Vista. Consider using SHCreateStreamOnFileEx.",
+    "SHDestroyPropSheetExtArray"         : "SHDestroyPropSheetExtArray is deprecated as of Windows Vista.",
+    "Shell_GetCachedImageIndex"          : "Shell_GetCachedImageIndex is deprecated as of Windows Vista. Consider using Shell_GetCachedImageIndexA or Shell_GetCachedImageIndexW instead.",
+    "Shell_GetImageLists"                : "Shell_GetImageLists is deprecated as of Windows Vista.",
+    "Shell_MergeMenus"                   : "Shell_MergeMenus is deprecated as of Windows Vista.",
+    "ShellMessageBox"                    : "ShellMessageBox is deprecated as of Windows Vista.",
+    "SHExtractIconsW"                    : "SHExtractIconsW is deprecated as of Windows Vista.",
+    "SHFind_InitMenuPopup"               : "SHFind_InitMenuPopup is deprecated as of Windows Vista.",
+    "SHFindFiles"                        : "SHFindFiles is deprecated as of Windows Vista.",
+    "SHFlushClipboard"                   : "SHFlushClipboard is removed in Windows Vista. Consider using OleFlushClipboard instead.",
+    "SHFlushSFCache"                     : "SHFlushSFCache is deprecated as of Windows Vista.",
+    "SHFormatDateTime"                   : "SHFormatDateTime is deprecated as of Windows Vista.",
+    "SHFormatDrive"                      : "SHFormatDrive is deprecated as of Windows Vista.",
+    "SHFree"                             : "SHFree is deprecated as of Windows Vista. Consider using CoTaskMemFree instead.",
+    "SHFreeShared"                       : "SHFreeShared is deprecated as of Windows Vista.",
+    "SHGetAttributesFromDataObject"      : "SHGetAttributesFromDataObject is deprecated as of Windows Vista.",
+    "SHGetFileInfoWrapW"                 : "SHGetFileInfoWrapW should not be used. Consider using SHGetFileInfo instead.",
+    "SHGetFolderLocation"                : "SHGetFolderLoacation is deprecated as of Windows Vista. Consider using SHGetKnownFolderIDList instead.",
+    "SHGetFolderPath"                    : "SHGetFolderPath is deprecated as of Windows Vista. Consider using SHGetKnownFolderPath instead.",
+    "SHGetFolderPathAndSubDir"           : "SHGetFolderPathAndSubDir is deprecated as of Windows Vista.",
+    "SHGetInverseCMAP"                   : "SHGetInverseCMAP is deprecated as of Windows Vista.",
+    "SHGetMalloc"                        : "SHGetMalloc is deprecated as of Windows Vista. Consider using CoTaskMemAlloc instead.",
+    "SHGetPathFromIDListWrapW"           : "SHGetPathFromIDListWrapW should not be used. Consider using SHGetPathFromIDList instead.",
+    "SHGetRealIDL"                       : "SHGetRealIDL is deprecated as of Windows Vista.",
+    "SHGetSetFolderCustomSettings"       : "SHGetSetFolderCustomSettings is deprecated as of Windows Vista.",
+    "SHGetSetSettings"                   : "SHGetSetSettings is deprecated as of Windows Vista.",
+    "SHGetShellStyleHInstance"           : "SHGetShellStyleHInstance is removed in Windows Vista and later.",
+    "SHGetSpecialFolderLocation"         : "SHGetSpecialFolderLocation is deprecated as of Windows 2000. Consider using SHGetKnownFolderIDList instead.",
+    "SHGetSpecialFolderPath"             : "SHGetSpecialFolderPath is deprecated as of Windows 2000. Consider using SHGetKnownFolderPath instead.",
+    "SHGetViewStatePropertyBag"          : "SHGetViewStatePropertyBag is deprecated as of Windows Vista.",
+    "SHHandleUpdateImage"                : "SHHandleUpdateImage is deprecated as of Windows Vista.",
+    "SHILCreateFromPath"                 : "SHILCreateFromPath is deprecated as of Windows Vista. Consider using SHParseDisplayName instead.",
+    "SHInvokePrinterCommand"             : "SHInvokePrinterCommand is deprecated as of Windows Vista. It is recommended to invoke verbs on printers via IContextMenu or ShellExecute.",
+    "SHIsChildOrSelf"                    : "SHIsChildOrSelf is deprecated as of Windows Vista.",
+    "SHLimitInputEdit"                   : "SHLimitInputEdit is deprecated as of Windows Vista.",
+    "SHLoadOLE"                          : "SHLoadOLE is deprecated as of Windows Vista.",
+    "SHLockShared"                       : "SHLockShared is deprecated as of Windows Vista.",
+    "SHMapIDListToImageListIndexAsync"   : "SHMapIDListToImageListIndexAsync is removed in Windows Vista.",
+    "SHMapPIDLToSystemImageListIndex"    : "SHMapPIDLToSystemImageListIndex is deprecated as of Windows Vista.",
+    "SHMessageBoxCheck"                  : "SHMessageBoxCheck is deprecated as of Windows Vista.",
+    "SHObjectProperties"                 : "SHObjectProperties is deprecated as of Windows Vista.",
+    "SHOpenPropSheet"                    : "SHOpenPropSheet is deprecated as of Windows Vista.",
+    "SHOpenRegStream"                    : "SHOpenRegStream has been superseded by SHOpenRegStream2. Consider using it instead.",
+    "SHRegGetBoolValueFromHKCUHKLM"      : "SHRegGetBoolValueFromHKCUHKLM is deprecated as of Windows Vista.",
+    "SHRegGetValue"                      : "SHRegGetValue is deprecated as of Windows Vista. Consider using RegGetValue instead.",
+    "SHRegGetValueFromHKCUHKLM"          : "SHRegGetValueFromHKCUHKLM is deprecated as of Windows Vista.",
+    "SHReplaceFromPropSheetExtArray"     : "SHReplaceFromPropSheetExtArray is deprecated as of Windows Vista.",
+    "SHRestricted"                       : "SHRestricted is deprecated as of Windows Vista.",
+    "SHSetFolderPath"                    : "SHSetFolderPath is deprecated as of Windows Vista. Consider using SHSetKnownFolderPath instead.",
+    "SHSendMessageBroadcast"             : "SHSendMessageBroadcast is deprecated as of Windows Vista. Consider using SendMessage with the hWnd parameter as HWND_BROADCAST instead.",
+    "SHShellFolderView_Message"          : "SHShellFolderView_Message is deprecated as of Windows Vista.",
+    "SHSimpleIDListFromPath"             : "SHSimpleIDListFromPath is deprecated as of Windows 8. Consider the following alternatives: \n\t1. Call SHGetDesktopFolder to obtain IShellFolder for the desktop folder.\n\t2. Get the IShellFolder's bind context (IBindCtx).\n\t3. Call IShellFolder::ParseDisplayName with the IBindCtx and the path.",
+    "SHStartNetConnectionDialog"         : "SHStartNetConnectionDialog is deprecated as of Windows Vista.",
+    "SHStripMneumonic"                   : "SHStripMneumonic is deprecated as of Windows Vista.",
+    "SHUnicodeToAnsi"                    : "SHUnicodeToAnsi is deprecated as of Windows Vista.",
+    "SHUnicodeToUnicode"                 : "SHUnicodeToUnicode is deprecated as of Windows Vista.",
+    "SHUnlockShared"                     : "SHUnlockShared is deprecated as of Windows Vista.",
+    "SHValidateUNC"                      : "SHValidateUNC is deprecated as of Windows 7.",
+    "SignalFileOpen"                     : "SignalFileOpen is deprecated as of Windows Vista.",
+    "StopWatchFlush"                     : "StopWatchFlush is deprecated as of Windows Vista.",
+    "StopWatchMode"                      : "StopWatchMode is deprecated as of Windows Vista.",
+    "TranslateAcceleratorWrapW"          : "TranslateAcceleratorWrapW should not be used. Consider using TranslateAccelerator instead.",
+    "UnregisterClassWrapW"               : "UnregisterClassWrapW should not be used. Consider using UnregisterClass instead.",
+    "UpdateAllDesktopSubscriptions"      : "UpdateAllDesktopSubscriptions is deprecated",
+    "UrlFixupW"                          : "UrlFixupW is deprecated as of Windows 8",
+    "WhichPlatform"                      : "WhichPlatform is deprecated as of Windows Vista",
+    "Win32DeleteFile"                    : "Win32DeleteFile is deprecated as of Windows Vista",
+    "WOWShellExecute"                    : "WOWShellExecute is deprecated as of Windows Vista. Consider using ShellExecute instead.",
+    "WriteCabinetState"                  : "WriteCabinetState is deprecated as of Windows Vista."
+}
+
+# A rule from one of the tables above. category is the name of the table it comes from.
+Rule = namedtuple("Rule", ["identifier", "category", "message"])
+
+# A single hit of a rule in a source file. column is 1-based and None when it isn't known.
+Finding = namedtuple("Finding", ["path", "linenumber", "column", "identifier", "category", "message"])
+
+
+# Returns (category, table) for every enabled rule table, in the order findings are reported in.
+def enabled_rule_tables(cautionary, posix, windows):
+    tables = [("deprecated", deprecatedDict)]
+    if cautionary:
+        tables.append(("cautionary", cautionaryDict))
+    if posix:
+        tables.append(("posix", posixDict))
+    if windows:
+        tables.append(("windows", windowsDict))
+    return tables
+
+
+# Merges the enabled rule tables into a single read-only index, mapping the raw bytes of an identifier
+# (which is what the tokenizer hands out) to all of its rules. That way each token takes one lookup.
+# The index is built once per process for every combination of tables.
+@lru_cache(maxsize=None)
+def build_rule_index(cautionary, posix, windows):
+    index = {}
+    for category, table in enabled_rule_tables(cautionary, posix, windows):
+        for identifier, message in table.items():
+            key = identifier.encode("ascii")
+            index[key] = index.get(key, ()) + (Rule(identifier, category, message),)
+    return MappingProxyType(index)
+
+
+# Identifier-like words, and the bytes that end them.
+_WORD = re.compile(rb"[A-Za-z_][A-Za-z0-9_]*")
+_NON_WORD = re.compile(rb"[^A-Za-z0-9_]")
+
+# Bytes of a file the prefilter looks at in one go, so huge files don't turn into huge word lists.
+_PREFILTER_WINDOW = 1 << 20
+
+
+# Builds a function that tells whether the raw bytes of a file contain any identifier of the enabled
+# rule sets as a whole word. Files without one are never tokenized. The words are collected with a
+# single findall per window and checked against the rule identifiers with one set operation, which
+# is far cheaper than searching for every identifier.
+#
+# This is not quite a superset of what the tokenizer finds: it joins the pieces of a word that are
+# split by a comment, a literal or template arguments, so "ge/**/ts" is reported as gets with
+# --no-prefilter, but the file is skipped with the prefilter on.
+def build_prefilter(cautionary, posix, windows):
+    keys = frozenset(build_rule_index(cautionary, posix, windows))
+    findall = _WORD.findall
+
+    def may_match(data):
+        datalen = len(data)
+        pos = 0
+        while pos < datalen:
+            # Windows end after a whole word, so no word is ever cut in two.
+            end = _NON_WORD.search(data, min(pos + _PREFILTER_WINDOW, datalen))
+            end = datalen if end is None else end.start()
+            if not keys.isdisjoint(findall(data, pos, end)):
+                return True
+            pos = end
+        return False
+
+    return may_match
+
+
+# Checks if a token contains a function name in the rule index.
+# If present, a Finding with the corresponding suggestion is yielded right away. locate, if given, is
+# called with the line and offset of the token and returns the column of the finding.
+def match_tokens(filepath, tokens, index, locate=None):
+    lookup = index.get
+    for token in tokens:
+        rules = lookup(token.raw)
+        if rules is not None:
+            column = None if locate is None else locate(token.linenumber, token.offset)
+            for rule in rules:
+                yield Finding(filepath, token.linenumber, column, rule.identifier, rule.category, rule.message)
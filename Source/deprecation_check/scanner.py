@@ -0,0 +1,184 @@
+# Library interface for checking C/C++ sources from within another Python process.
+#
+#   from deprecation_check import Scanner
+#
+#   scanner = Scanner(posix=True)
+#   for finding in scanner.scan_paths(["src", "include/foo.h"]):
+#       print(finding.path, finding.linenumber, finding.column, finding.category, finding.message)
+#
+# A Scanner builds its rule index and prefilter once, so a long-lived process can reuse it for
+# any number of scans.
+
+import os
+import time
+from functools import lru_cache
+
+from .pathutils import ExcludePatterns, iter_files_from_dir
+from .preprocessor import blank_disabled, parse_defines
+from .rules import Finding, build_prefilter, build_rule_index, match_tokens
+from .tokenizer import Tokenizer, TokenizerTimeout, map_source
+
+# Extensions of the files that are checked when searching directories.
+SOURCE_EXTENSIONS = (".c", ".cc", ".cpp", ".cxx", ".h", ".hh", ".hpp", ".hxx", ".tpp")
+
+# What to do with files over the size limit: leave them out, or only check their beginning.
+OVERSIZE_ACTIONS = ("skip", "sample")
+
+# Category of the findings that report a file hit a limit instead of a rule.
+LIMIT_CATEGORY = "limit"
+
+# Bytes of the file that are counted at a time when working out the line of an offset.
+_LINE_COUNT_BLOCK = 1 << 20
+
+
+# Works out the columns of findings from the byte offsets the tokenizer gives their tokens. Offsets
+# come in increasing order in the order tokens are found in, so the lines before them are only
+# counted once. An identifier pieced together around a comment or literal can start on a later line
+# than its token, and gets no column, as it isn't on the line it is reported on.
+class _ColumnLocator:
+    def __init__(self, data):
+        self._data = data
+        self._offset = 0
+        self._linenum = 1
+
+    def __str__(self):
+        return "_ColumnLocator - line %d" % self._linenum
+
+    def __repr__(self):
+        return "_ColumnLocator - line %d" % self._linenum
+
+    # Returns the 1-based byte column of the token at offset, or None if it isn't on the given line.
+    def column(self, linenumber, offset):
+        if offset is None:
+            return None
+
+        data = self._data
+        if offset < self._offset:
+            self._offset = 0
+            self._linenum = 1
+        for start in range(self._offset, offset, _LINE_COUNT_BLOCK):
+            self._linenum += data[start:min(start + _LINE_COUNT_BLOCK, offset)].count(b"\n")
+        self._offset = offset
+        if self._linenum != linenumber:
+            return None
+        return offset - data.rfind(b"\n", 0, offset)
+
+
+# With preprocess set, code in conditionals that are never compiled, like #if 0, is skipped.
+# defines are -D style NAME or NAME=VALUE strings and undefines -U style names, which decide
+# further conditionals.
+#
+# Files bigger than max_file_size bytes are skipped or, with oversize set to "sample", only checked
+# up to the last line that fits. A file that takes longer than timeout seconds to check is stopped
+# there. Either way a finding of LIMIT_CATEGORY reports it. chunk_size is passed on to the Tokenizer.
+class Scanner:
+    def __init__(self, cautionary=False, posix=False, windows=False, engine="buffered", prefilter=True,
+                 fallback_encoding="latin-1", preprocess=False, defines=(), undefines=(),
+                 max_file_size=None, oversize="skip", timeout=None, chunk_size=None):
+        if engine not in Tokenizer.ENGINES:
+            raise ValueError("Unknown tokenizer engine: %s" % engine)
+        if oversize not in OVERSIZE_ACTIONS:
+            raise ValueError("Unknown oversize action: %s" % oversize)
+
+        self._index = build_rule_index(cautionary, posix, windows)
+        self._prefilter = build_prefilter(cautionary, posix, windows) if prefilter else None
+        self._engine = engine
+        self._encoding = fallback_encoding
+        self._preprocess = preprocess
+        self._defines = parse_defines(defines)
+        self._undefines = frozenset(name.encode("ascii") for name in undefines)
+        self._max_file_size = max_file_size
+        self._oversize = oversize
+        self._timeout = timeout
+        self._chunk_size = chunk_size
+
+    def __str__(self):
+        return "Scanner - %d identifiers" % len(self._index)
+
+    def __repr__(self):
+        return "Scanner - %d identifiers" % len(self._index)
+
+    def _may_match(self, data):
+        return self._prefilter is None or self._prefilter(data)
+
+    # Returns the part of data to check, or None if none of it should be, along with a finding
+    # about the size limit if data is over it.
+    def _limit(self, path, data):
+        if self._max_file_size is None or len(data) <= self._max_file_size:
+            return data, None
+
+        if self._oversize == "skip":
+            message = "File skipped, it is larger than %d bytes (%d bytes)." % (self._max_file_size, len(data))
+            return None, Finding(path, 1, None, "max-file-size", LIMIT_CATEGORY, message)
+
+        end = data.rfind(b"\n", 0, self._max_file_size) + 1 or self._max_file_size
+        message = "Only the first %d of %d bytes were checked, the file is larger than %d bytes." % \
+                  (end, len(data), self._max_file_size)
+        return data[:end], Finding(path, 1, None, "max-file-size", LIMIT_CATEGORY, message)
+
+    def _scan(self, path, data):
+        deadline = None if self._timeout is None else time.monotonic() + self._timeout
+        if self._preprocess:
+            data = blank_disabled(data, self._defines, self._undefines)
+        locator = _ColumnLocator(data)
+        tokens = Tokenizer(path, self._engine, self._encoding, data, self._chunk_size, deadline)
+
+        try:
+            yield from match_tokens(path, tokens, self._index, locator.column)
+        except TokenizerTimeout as timeout:
+            message = "Checking the file took longer than %g seconds, stopped at line %d." % (self._timeout, timeout.linenumber)
+            yield Finding(path, timeout.linenumber, None, "file-timeout", LIMIT_CATEGORY, message)
+
+    def _check(self, path, data):
+        data, limitfinding = self._limit(path, data)
+        if limitfinding is not None:
+            yield limitfinding
+        if data is not None and self._may_match(data):
+            yield from self._scan(path, data)
+
+    # Yields the findings in the given bytes. path is only used to fill in the findings.
+    def scan_bytes(self, data, path="<bytes>"):
+        yield from self._check(path, data)
+
+    # Yields the findings in a single file.
+    def scan_file(self, filepath):
+        with map_source(filepath) as data:
+            yield from self._check(filepath, data)
+
+    # Returns the findings in a file as a list, or None if the prefilter ruled out the file without tokenizing it.
+    def check_file(self, filepath):
+        with map_source(filepath) as data:
+            checked, limitfinding = self._limit(filepath, data)
+            if checked is not None and self._may_match(checked):
+                findings = list(self._scan(filepath, checked))
+            elif limitfinding is None:
+                return None
+            else:
+                findings = []
+
+            if limitfinding is not None:
+                findings.insert(0, limitfinding)
+            return findings
+
+    # Yields the findings in all the given files and directories. Directories are searched
+    # recursively for files with one of the extensions, skipping anything matched by excludes.
+    def scan_paths(self, paths, extensions=SOURCE_EXTENSIONS, excludes=None):
+        if excludes is None:
+            excludes = ExcludePatterns()
+
+        for path in paths:
+            if os.path.isdir(path):
+                for filepath in iter_files_from_dir(path, extensions, True, excludes):
+                    yield from self.scan_file(filepath)
+            else:
+                yield from self.scan_file(path)
+
+
+# Returns a Scanner for the given options, creating one only the first time they are asked for
+# in a process. This is what lets worker processes reuse their rule index between files.
+@lru_cache(maxsize=None)
+def get_scanner(cautionary=False, posix=False, windows=False, engine="buffered", prefilter=True,
+                fallback_encoding="latin-1", preprocess=False, defines=(), undefines=(),
+                max_file_size=None, oversize="skip", timeout=None, chunk_size=None):
+    return Scanner(cautionary, posix, windows, engine, prefilter, fallback_encoding, preprocess, defines, undefines,
+                   max_file_size, oversize, timeout, chunk_size)
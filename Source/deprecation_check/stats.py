@@ -0,0 +1,146 @@
+import heapq
+import os
+import time
+
+from .tokenizer import Tokenizer
+
+# Stages in the order they are reported in. Stages nest, tokenize includes sanitize and scan includes both.
+STAGES = ("discovery", "scan", "tokenize", "sanitize", "output")
+
+# Stats the instrumented functions report to, or None while nothing is being collected.
+_current = None
+_instrumented = False
+
+
+# Wall and CPU time spent per stage of a scan, plus a few counters and the slowest files.
+class Stats:
+    def __init__(self, slowest=10):
+        self.stages = {}
+        self.counters = {}
+        self._slowest = slowest
+        self._files = []
+
+    def __str__(self):
+        return "Stats - %d stages" % len(self.stages)
+
+    def __repr__(self):
+        return "Stats - %d stages" % len(self.stages)
+
+    def add_time(self, stage, wall, cpu, calls=1):
+        totals = self.stages.setdefault(stage, [0.0, 0.0, 0])
+        totals[0] += wall
+        totals[1] += cpu
+        totals[2] += calls
+
+    def count(self, counter, amount=1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def add_file(self, filepath, seconds):
+        if len(self._files) < self._slowest:
+            heapq.heappush(self._files, (seconds, filepath))
+        else:
+            heapq.heappushpop(self._files, (seconds, filepath))
+
+    # Plain data copy of the stats, so they can be sent back from a worker process.
+    def snapshot(self):
+        return self.stages, self.counters, self._files
+
+    def merge(self, snapshot):
+        stages, counters, files = snapshot
+        for stage, (wall, cpu, calls) in stages.items():
+            self.add_time(stage, wall, cpu, calls)
+        for counter, amount in counters.items():
+            self.count(counter, amount)
+        for seconds, filepath in files:
+            self.add_file(filepath, seconds)
+
+    def report(self, outfile):
+        print("%-12s %10s %10s %10s" % ("stage", "wall (s)", "cpu (s)", "calls"), file=outfile)
+        for stage in sorted(self.stages, key=lambda stage: STAGES.index(stage) if stage in STAGES else len(STAGES)):
+            wall, cpu, calls = self.stages[stage]
+            print("%-12s %10.3f %10.3f %10d" % (stage, wall, cpu, calls), file=outfile)
+
+        for counter in sorted(self.counters):
+            print("%s: %d" % (counter, self.counters[counter]), file=outfile)
+
+        if self._files:
+            print("slowest files:", file=outfile)
+            for seconds, filepath in sorted(self._files, reverse=True):
+                print("%10.3f  %s" % (seconds, filepath), file=outfile)
+
+
+# Times a single function call as a stage.
+def _timed_function(stage, function):
+    def timed(*args, **kwargs):
+        if _current is None:
+            return function(*args, **kwargs)
+
+        start, startcpu = time.perf_counter(), time.process_time()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _current.add_time(stage, time.perf_counter() - start, time.process_time() - startcpu)
+    return timed
+
+
+# Times a generator as a stage, over all of its steps, and counts what it yields.
+def timed_iter(stage, iterable, counter=None, stats=None):
+    stats = stats or _current
+    iterator = iter(iterable)
+    wall = cpu = 0.0
+    items = 0
+    try:
+        while True:
+            start, startcpu = time.perf_counter(), time.process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                wall += time.perf_counter() - start
+                cpu += time.process_time() - startcpu
+            items += 1
+            yield item
+    finally:
+        stats.add_time(stage, wall, cpu)
+        if counter is not None:
+            stats.count(counter, items)
+
+
+def _timed_generator(stage, counter, function):
+    def timed(*args, **kwargs):
+        if _current is None:
+            return function(*args, **kwargs)
+        return timed_iter(stage, function(*args, **kwargs), counter)
+    return timed
+
+
+# Wraps the hot spots of the tokenizer with timing hooks. Until this is called nothing is
+# instrumented, so collecting stats costs nothing when it isn't asked for.
+def instrument():
+    global _instrumented
+    if _instrumented:
+        return
+
+    Tokenizer._parse_buffer = _timed_generator("tokenize", "tokens", Tokenizer._parse_buffer)
+    Tokenizer._parse_file = _timed_generator("tokenize", "tokens", Tokenizer._parse_file)
+    Tokenizer._sanitize_tokens = _timed_function("sanitize", Tokenizer._sanitize_tokens)
+    _instrumented = True
+
+
+# Runs scan(filepath, ...) for a single file while collecting stats about it. Returns the result of
+# scan along with a snapshot of the stats, which is how worker processes report back.
+def collect_stats(scan, filepath, *args, **kwargs):
+    global _current
+    instrument()
+    _current = Stats()
+    try:
+        start, startcpu = time.perf_counter(), time.process_time()
+        result = scan(filepath, *args, **kwargs)
+        wall = time.perf_counter() - start
+        _current.add_time("scan", wall, time.process_time() - startcpu)
+        _current.add_file(filepath, wall)
+        _current.count("bytes", os.path.getsize(filepath))
+        return result, _current.snapshot()
+    finally:
+        _current = None
@@ -0,0 +1,495 @@
+# TODO: Improve this greatly.
+# TODO: Skip tokenizing string occurrences. These are not necessary.
+
+import io
+import mmap
+import os
+import re
+import time
+from bisect import bisect_right
+from contextlib import contextmanager, nullcontext
+
+# Characters that may start a comment or literal outside of comments and strings.
+_SPECIAL_CHARS = re.compile(rb"[/\"']")
+
+# Characters that terminate or escape within a string literal.
+_STRING_CHARS = re.compile(rb'["\\]')
+
+# Templated arguments, which are clipped off before splitting a token if possible.
+_TEMPLATE_ARGS = re.compile(rb"<[^>]*>")
+
+# Runs of characters between the punctuation that separates identifiers.
+_IDENTIFIER_CHARS = re.compile(rb"[^()!+,\-./*~^#?:><&|;{} ]+")
+
+# Bytes that don't stand for a character of their own in the text _parse_file reads: carriage returns,
+# which are translated to newlines, and anything that may start a multi-byte UTF-8 sequence.
+_NON_PLAIN = re.compile(rb"[\r\x80-\xff]")
+
+# Number of characters _parse_file reads between checks of the deadline.
+_DEADLINE_INTERVAL = 4096
+
+_SLASH = ord("/")
+_QUOTE = ord("\"")
+
+
+# Maps a file into memory read-only, so it can be scanned without reading or decoding it up front.
+# Empty files can't be mapped and are handed out as an empty bytes object instead.
+@contextmanager
+def map_source(filepath):
+    with open(filepath, "rb") as sourcefile:
+        if os.fstat(sourcefile.fileno()).st_size == 0:
+            yield b""
+        else:
+            with mmap.mmap(sourcefile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                yield data
+
+
+# Decodes raw bytes from a source file as UTF-8, or with the fallback encoding if they aren't valid UTF-8.
+def decode_source(raw, fallback_encoding="latin-1"):
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode(fallback_encoding, "replace")
+
+
+# Returns the offset of the first match of pattern in data from pos on, and before endpos if given, or -1.
+# The match object is dropped right away, as it would otherwise pin a memory-mapped file open.
+def _search(pattern, data, pos, endpos=None):
+    match = pattern.search(data, pos) if endpos is None else pattern.search(data, pos, endpos)
+    return -1 if match is None else match.start()
+
+
+# Counts the newlines between start and end, copying at most chunksize bytes at a time.
+def _count_newlines(data, start, end, chunksize):
+    if end - start <= chunksize:
+        return data[start:end].count(b"\n")
+    return sum(data[idx:min(idx + chunksize, end)].count(b"\n") for idx in range(start, end, chunksize))
+
+
+# Skips count UTF-8 encoded characters starting at pos, so literals are skipped the same way _parse_file does.
+def _skip_chars(data, pos, count):
+    datalen = len(data)
+    for _ in range(count):
+        pos += 1
+        while pos < datalen and 0x80 <= data[pos] < 0xC0:
+            pos += 1
+    return pos
+
+
+# Returns the number of bytes the character at pos takes when decoded as UTF-8 with surrogateescape,
+# which turns every byte of an invalid sequence into a character of its own.
+def _char_length(data, pos):
+    lead = data[pos]
+    length = 2 if 0xC2 <= lead <= 0xDF else 3 if 0xE0 <= lead <= 0xEF else 4 if 0xF0 <= lead <= 0xF4 else 1
+    if length > 1:
+        try:
+            data[pos:pos + length].decode("utf-8")
+        except UnicodeDecodeError:
+            return 1
+    return length
+
+
+# Returns raw with its templated arguments clipped off, the same way as _TEMPLATE_ARGS.sub, along with
+# the starts and offsets of its pieces mapped onto what is left of it. See Tokenizer._sanitize_tokens.
+def _clip_templates(raw, starts, offsets):
+    kept = []
+    pos = 0
+    for match in _TEMPLATE_ARGS.finditer(raw):
+        kept.append((pos, match.start()))
+        pos = match.end()
+    kept.append((pos, len(raw)))
+
+    pieces = []
+    clippedstarts = []
+    clippedoffsets = []
+    length = 0
+    for start, end in kept:
+        if start == end:
+            continue
+        pieces.append(raw[start:end])
+        # A kept range may run over several pieces of raw, each of which starts a piece of its own.
+        idx = bisect_right(starts, start) - 1
+        while start < end:
+            stop = min(end, starts[idx + 1] if idx + 1 < len(starts) else end)
+            clippedstarts.append(length)
+            clippedoffsets.append(offsets[idx] + start - starts[idx])
+            length += stop - start
+            start = stop
+            idx += 1
+    return b"".join(pieces), clippedstarts, clippedoffsets
+
+
+# Turns offsets in the text _parse_file reads, which is decoded and has its line endings translated,
+# into byte offsets in the file. Offsets have to be asked for in increasing order, which lets the bytes
+# be walked once; runs of ASCII without carriage returns are skipped over without looking at them.
+class _ByteOffsets:
+    def __init__(self, data):
+        self._data = data
+        self._charoffset = 0
+        self._byteoffset = 0
+
+    def __str__(self):
+        return "_ByteOffsets - %d" % self._byteoffset
+
+    def __repr__(self):
+        return "_ByteOffsets - %d" % self._byteoffset
+
+    def find(self, charoffset):
+        data = self._data
+        pos = self._byteoffset
+        count = charoffset - self._charoffset
+        while count > 0:
+            special = _search(_NON_PLAIN, data, pos, pos + count)
+            if special == -1:
+                pos += count
+                break
+
+            count -= special - pos + 1
+            if data[special] == 13:
+                pos = special + (2 if data[special + 1:special + 2] == b"\n" else 1)
+            else:
+                pos = special + _char_length(data, special)
+
+        self._charoffset = charoffset
+        self._byteoffset = pos
+        return pos
+
+
+# Raised while tokenizing once the deadline given to the Tokenizer has passed, with the line it stopped at.
+class TokenizerTimeout(Exception):
+    def __init__(self, linenumber):
+        super().__init__(linenumber)
+        self.linenumber = linenumber
+
+
+class Token:
+    # Millions of these can be created in a single run, so skip the per-instance __dict__.
+    # The token is kept as the raw bytes from the file and only decoded when string is asked for.
+    # offset is the byte offset of its first byte in the file, if known.
+    __slots__ = ("linenumber", "raw", "encoding", "offset")
+
+    def __init__(self, linenumber, raw, encoding="latin-1", offset=None):
+        self.linenumber = linenumber
+        self.raw = raw
+        self.encoding = encoding
+        self.offset = offset
+
+    @property
+    def string(self):
+        return decode_source(self.raw, self.encoding)
+
+    def __str__(self):
+        return self.string
+
+    def __repr__(self):
+        return self.string
+
+
+class Tokenizer:
+    # Available lexer backends. "buffered" scans the memory-mapped bytes of the file with
+    # index arithmetic, "char" is the original character-by-character engine.
+    ENGINES = ("buffered", "char")
+
+    # Tokens are produced lazily while iterating, so only the token being looked at is ever alive.
+    # Iterating again starts over from the beginning of the file. fallback_encoding is used to
+    # decode tokens that aren't valid UTF-8. If data is given, it is tokenized instead of reading
+    # the file, and filepath is only used as a name.
+    #
+    # With chunk_size given, the buffered engine never copies more than chunk_size bytes of the file
+    # at a time, so huge files of code without any comments or literals, like data embedded as C
+    # arrays, are lexed with bounded memory. Tokens that span two chunks are joined back together.
+    #
+    # Both engines set the byte offset of every token in the file, which lets hits be located.
+    #
+    # With deadline given, a time.monotonic() value, lexing raises TokenizerTimeout once it has passed.
+    # It is checked while skipping comments and literals as well, not only when tokens come out.
+    def __init__(self, filepath, engine="buffered", fallback_encoding="latin-1", data=None, chunk_size=None,
+                 deadline=None):
+        if engine not in Tokenizer.ENGINES:
+            raise ValueError("Unknown tokenizer engine: %s" % engine)
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("Chunk size has to be positive: %d" % chunk_size)
+
+        self._filepath = filepath
+        self._engine = engine
+        self._encoding = fallback_encoding
+        self._data = data
+        self._chunk_size = chunk_size
+        self._deadline = deadline
+        self._tokens = None
+
+    def __str__(self):
+        return "Tokenizer - %s" % self._filepath
+
+    def __repr__(self):
+        return "Tokenizer - %s" % self._filepath
+
+    # Iterating hands out the underlying generator directly, which saves a __next__ call per token.
+    def __iter__(self):
+        if self._engine == "buffered":
+            self._tokens = self._parse_buffer(self._filepath)
+        else:
+            self._tokens = self._parse_file(self._filepath)
+        return self._tokens
+
+    def __next__(self):
+        if self._tokens is None:
+            self.__iter__()
+        return next(self._tokens)
+
+    def _peek(self, file, num=1):
+        pos = file.tell()
+        data = file.read(num)
+        file.seek(pos, 0)
+        return data
+
+    # TODO: This is really crappy sanitizing. We should be able to parse with these present;
+    #       however, this is only necessary if we want to do small static analysis checks in the future.
+    #
+    # offset is where raw starts in the file. raw that was pieced together from parts around comments and
+    # literals comes with segments, the (starts, offsets) lists of where each part starts in raw and in
+    # the file, so every token gets the offset it has in the file.
+    def _sanitize_tokens(self, linenum, raw, offset, segments=None):
+        encoding = self._encoding
+        if segments is None and b"<" not in raw:
+            # Pieces are only split by punctuation, so each is found right after the one before it.
+            items = _IDENTIFIER_CHARS.findall(raw)
+            if len(items) == 1:
+                item = items[0]
+                return [Token(linenum, item, encoding, offset if item == raw else offset + raw.find(item))]
+            tokens = []
+            pos = 0
+            for item in items:
+                pos = raw.find(item, pos)
+                tokens.append(Token(linenum, item, encoding, offset + pos))
+                pos += len(item)
+            return tokens
+
+        starts, offsets = segments if segments is not None else ([0], [offset])
+        if b"<" in raw:
+            raw, starts, offsets = _clip_templates(raw, starts, offsets)
+        tokens = []
+        for match in _IDENTIFIER_CHARS.finditer(raw):
+            pos = match.start()
+            idx = bisect_right(starts, pos) - 1
+            tokens.append(Token(linenum, match.group(), encoding, offsets[idx] + pos - starts[idx]))
+        return tokens
+
+    # Sanitizes a token of the buffered engine, given as the (offset, bytes) parts it was pieced together from.
+    def _sanitize_parts(self, linenum, parts):
+        if len(parts) == 1:
+            offset, raw = parts[0]
+            return self._sanitize_tokens(linenum, raw, offset)
+
+        starts = []
+        offsets = []
+        length = 0
+        for offset, part in parts:
+            starts.append(length)
+            offsets.append(offset)
+            length += len(part)
+        return self._sanitize_tokens(linenum, b"".join(part for offset, part in parts), offsets[0], (starts, offsets))
+
+    # Sanitizes a token of the char engine. starts are the indices in text where a run of characters that
+    # are next to each other in the file begins, and charoffsets the offsets of those runs in the text read.
+    def _sanitize_text(self, linenum, text, starts, charoffsets, byteoffsets):
+        raw = text.encode("utf-8", "surrogateescape")
+        offsets = [byteoffsets.find(charoffset) for charoffset in charoffsets]
+        if len(starts) == 1:
+            return self._sanitize_tokens(linenum, raw, offsets[0])
+        if not text.isascii():
+            starts = [len(text[:start].encode("utf-8", "surrogateescape")) for start in starts]
+        return self._sanitize_tokens(linenum, raw, offsets[0], (starts, offsets))
+
+    def _parse_file(self, filepath):
+        # Undecodable bytes are carried through as surrogates, so tokens can be turned back into the raw bytes.
+        if self._data is None:
+            sourcefile = open(filepath, encoding="utf-8", errors="surrogateescape")
+        else:
+            sourcefile = io.TextIOWrapper(io.BytesIO(self._data), encoding="utf-8", errors="surrogateescape")
+
+        # Offsets of tokens are counted in characters read, and turned into byte offsets in the file.
+        with sourcefile, map_source(filepath) if self._data is None else nullcontext(self._data) as data:
+            byteoffsets = _ByteOffsets(data)
+            in_multi_line_comment = False
+            in_string = False
+            linenum = 1
+            linechar = sourcefile.read(1)
+            charpos = 1
+            tokenstr = ""
+            tokenline = linenum
+            tokenend = 0
+            tokenstarts = []
+            tokenoffsets = []
+            deadline = self._deadline
+            countdown = _DEADLINE_INTERVAL
+
+            while linechar != "":
+                countdown -= 1
+                if not countdown:
+                    countdown = _DEADLINE_INTERVAL
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise TokenizerTimeout(linenum)
+
+                if linechar == "\n":
+                    linenum += 1
+
+                if not in_multi_line_comment and not in_string:
+                    if linechar == "/" and self._peek(sourcefile) == '/':
+                        charpos += len(sourcefile.readline())
+                        linenum += 1
+                    elif linechar == "/" and self._peek(sourcefile) == "*":
+                        in_multi_line_comment = True
+                    elif linechar == "\"":
+                        in_string = True
+                    elif linechar == "'":
+                        if self._peek(sourcefile) == "\\":  # Special character escapes
+                            charpos += len(sourcefile.read(3))
+                        else:
+                            charpos += len(sourcefile.read(2))
+                    elif linechar.isspace() and not tokenstr.isspace():
+                        if tokenstr:
+                            yield from self._sanitize_text(tokenline, tokenstr, tokenstarts, tokenoffsets, byteoffsets)
+                        tokenstr = ""  # New token
+                    else:
+                        if not tokenstr:
+                            tokenline = linenum
+                            tokenstarts = [0]
+                            tokenoffsets = [charpos - 1]
+                        elif tokenend != charpos - 1:
+                            tokenstarts.append(len(tokenstr))
+                            tokenoffsets.append(charpos - 1)
+                        tokenstr += linechar
+                        tokenend = charpos
+                elif in_multi_line_comment and linechar == "*" and self._peek(sourcefile) == "/":
+                    in_multi_line_comment = False
+                    charpos += len(sourcefile.read(1))
+                elif in_string:
+                    if linechar == "\\":   # Skip escaped chars
+                        charpos += len(sourcefile.read(1))
+                    elif linechar == "\"":
+                        in_string = False
+
+                linechar = sourcefile.read(1)
+                charpos += 1
+
+    # Buffered equivalent of _parse_file. Produces the same tokens and line numbers, but only stops at
+    # comment and literal delimiters and splits the code in between with bytes.split. Comments and
+    # literals are skipped over in the mapped file without being decoded, and are only copied in
+    # chunks to count their lines. Unlike _parse_file, only ASCII whitespace separates tokens and
+    # only '\n' starts a new line.
+    def _parse_buffer(self, filepath):
+        with map_source(filepath) if self._data is None else nullcontext(self._data) as data:
+            datalen = len(data)
+            chunksize = self._chunk_size or datalen
+            deadline = self._deadline
+            linenum = 1
+            pos = 0
+            tokenline = linenum
+            tokenparts = []
+
+            while pos < datalen:
+                if deadline is not None and time.monotonic() > deadline:
+                    raise TokenizerTimeout(linenum)
+
+                start = _search(_SPECIAL_CHARS, data, pos)
+                end = datalen if start == -1 else start
+                if end - pos > chunksize:
+                    # _parse_code carries a token cut off at the end of a chunk over to the next one.
+                    for chunkstart in range(pos, end, chunksize):
+                        if deadline is not None and time.monotonic() > deadline:
+                            raise TokenizerTimeout(linenum)
+                        chunk = data[chunkstart:min(chunkstart + chunksize, end)]
+                        linenum, tokenline, tokenparts = yield from self._parse_code(chunk, chunkstart, linenum, tokenline,
+                                                                                     tokenparts)
+                elif end != pos:
+                    linenum, tokenline, tokenparts = yield from self._parse_code(data[pos:end], pos, linenum, tokenline,
+                                                                                 tokenparts)
+                if start == -1:
+                    break  # Like _parse_file, a trailing token without whitespace after it is dropped.
+
+                char = data[start]
+                pos = start + 1
+
+                if char == _SLASH:
+                    nextchar = data[pos:pos + 1]
+                    if nextchar == b"/":
+                        end = data.find(b"\n", pos)
+                        pos = datalen if end == -1 else end + 1
+                        linenum += 1
+                    elif nextchar == b"*":
+                        # The '*' opening the comment may also close it, same as _parse_file.
+                        end = data.find(b"*/", pos)
+                        if end == -1:
+                            break
+                        linenum += _count_newlines(data, pos, end, chunksize)
+                        pos = end + 2
+                    else:
+                        if not tokenparts:
+                            tokenline = linenum
+                        tokenparts.append((start, b"/"))
+                elif char == _QUOTE:
+                    while True:
+                        if deadline is not None and time.monotonic() > deadline:
+                            raise TokenizerTimeout(linenum)
+                        end = _search(_STRING_CHARS, data, pos)
+                        if end == -1:
+                            pos = datalen
+                            break
+
+                        linenum += _count_newlines(data, pos, end, chunksize)
+                        if data[end] == _QUOTE:
+                            pos = end + 1
+                            break
+                        pos = _skip_chars(data, end + 1, 1)  # Skip escaped chars
+                else:
+                    if data[pos:pos + 1] == b"\\":  # Special character escapes
+                        pos = _skip_chars(data, pos, 3)
+                    else:
+                        pos = _skip_chars(data, pos, 2)
+
+    # Splits a run of code without comments or literals into tokens, numbered with the line they start on.
+    # offset is where the code starts in the file. A token that runs up to the end of the code is returned
+    # as pending, as the (offset, bytes) parts it is made of, along with its line, so it can be joined with
+    # whatever follows the next comment or literal. The parts of a pending token are only joined once it
+    # ends, so code split up by many literals without whitespace in between stays linear.
+    def _parse_code(self, code, offset, linenum, tokenline, tokenparts):
+        lines = code.split(b"\n")
+        lastidx = len(lines) - 1
+        deadline = self._deadline
+
+        for idx, line in enumerate(lines):
+            if deadline is not None and time.monotonic() > deadline:
+                raise TokenizerTimeout(linenum)
+            words = line.split()
+            first = 0
+            if tokenparts and (line or idx != lastidx):
+                if words and not line[:1].isspace():
+                    tokenparts.append((offset, words[0]))
+                    if idx == lastidx and len(words) == 1 and not line[-1:].isspace():
+                        break  # The whole line continues the pending token.
+                    first = 1
+                yield from self._sanitize_parts(tokenline, tokenparts)
+                tokenparts = []
+
+            if len(words) > first:
+                if idx == lastidx and not line[-1:].isspace():
+                    word = words.pop()
+                    tokenparts = [(offset + len(line) - len(word), word)]
+                    tokenline = linenum
+
+                # Words are only separated by whitespace, so each is the next match after the one before.
+                pos = len(words[0]) if first else 0
+                for wordidx in range(first, len(words)):
+                    if deadline is not None and not wordidx & 0xFFF and time.monotonic() > deadline:
+                        raise TokenizerTimeout(linenum)
+                    word = words[wordidx]
+                    pos = line.find(word, pos)
+                    yield from self._sanitize_tokens(linenum, word, offset + pos)
+                    pos += len(word)
+
+            if idx != lastidx:
+                linenum += 1
+                offset += len(line) + 1
+
+        return linenum, tokenline, tokenparts
@@ -0,0 +1,178 @@
+# Long-running modes that keep a Scanner and the findings of every file in memory, so repeated
+# checks only cost a rescan of the files that changed.
+#
+# --watch polls the inputs and prints findings as they appear and disappear:
+#
+#   +src/foo.cpp: line 12 - gets is removed in the C11 and C++11 standards.
+#   -src/foo.cpp: line 10 - gets is removed in the C11 and C++11 standards.
+#
+# --serve reads one JSON request per line from stdin and answers each with one JSON line on stdout:
+#
+#   {"id": 1, "method": "changes"}                    -> {"id": 1, "added": [...], "removed": [...]}
+#   {"id": 2, "method": "findings", "path": "a.cpp"}  -> {"id": 2, "findings": [...]}
+#   {"id": 3, "method": "scan", "paths": ["a.cpp"]}   -> {"id": 3, "findings": [...]}
+#   {"id": 4, "method": "scan", "path": "a.cpp", "content": "..."}
+#   {"id": 5, "method": "shutdown"}
+#
+# Findings are objects with the fields of rules.Finding. A scan with content checks the given text
+# instead of the file on disk, which lets editors check unsaved buffers.
+
+import json
+import os
+import time
+from collections import Counter
+
+from .pathutils import ExcludePatterns, iter_files_from_dir
+from .scanner import SOURCE_EXTENSIONS
+
+
+# Returns the findings that are in findings but not in others, keeping duplicates apart.
+def _difference(findings, others):
+    remaining = Counter(others)
+    difference = []
+    for finding in findings:
+        if remaining[finding] > 0:
+            remaining[finding] -= 1
+        else:
+            difference.append(finding)
+    return difference
+
+
+# Keeps the findings of every file under a set of paths up to date. Files are only rescanned when
+# their modification time or size changed since the last poll. Files are tracked by absolute path,
+# so they can be looked up however they are named, while findings keep the path discovery gave them.
+class Watcher:
+    def __init__(self, scanner, paths, recursive=True, extensions=SOURCE_EXTENSIONS, excludes=None):
+        self._scanner = scanner
+        self._paths = list(paths)
+        self._recursive = recursive
+        self.extensions = extensions
+        self.excludes = excludes if excludes is not None else ExcludePatterns()
+        self._files = {}
+        self.rescans = 0
+
+    def __str__(self):
+        return "Watcher - %d files" % len(self._files)
+
+    def __repr__(self):
+        return "Watcher - %d files" % len(self._files)
+
+    def _discover(self):
+        for path in self._paths:
+            if os.path.isdir(path):
+                yield from iter_files_from_dir(path, self.extensions, self._recursive, self.excludes)
+            elif os.path.isfile(path):
+                yield path
+
+    # Rescans what changed since the last poll and returns the (added, removed) findings.
+    # The first poll scans everything, so all findings come back as added.
+    def poll(self):
+        added = []
+        removed = []
+        seen = set()
+        for filepath in self._discover():
+            key = os.path.abspath(filepath)
+            try:
+                stat = os.stat(filepath)
+            except OSError:
+                continue
+            seen.add(key)
+
+            signature = (stat.st_mtime_ns, stat.st_size)
+            known = self._files.get(key)
+            if known is not None and known[0] == signature:
+                continue
+
+            try:
+                findings = self._scanner.check_file(filepath) or []
+            except OSError:
+                seen.discard(key)
+                continue
+            self.rescans += 1
+
+            oldfindings = known[1] if known is not None else []
+            self._files[key] = (signature, findings)
+            added.extend(_difference(findings, oldfindings))
+            removed.extend(_difference(oldfindings, findings))
+
+        for key in [key for key in self._files if key not in seen]:
+            removed.extend(self._files.pop(key)[1])
+
+        return added, removed
+
+    # Returns the findings as of the last poll, of a single file or of all of them.
+    def findings(self, filepath=None):
+        if filepath is not None:
+            known = self._files.get(os.path.abspath(filepath))
+            return list(known[1]) if known is not None else []
+        return [finding for signature, findings in self._files.values() for finding in findings]
+
+
+# Polls every interval seconds and writes the changes to outfile until interrupted.
+def watch(watcher, interval, outfile):
+    try:
+        while True:
+            start = time.monotonic()
+            added, removed = watcher.poll()
+            lines = ["-%s: line %d - %s\n" % (finding.path, finding.linenumber, finding.message) for finding in removed]
+            lines.extend("+%s: line %d - %s\n" % (finding.path, finding.linenumber, finding.message) for finding in added)
+            if lines:
+                outfile.write("".join(lines))
+                outfile.flush()
+            time.sleep(max(0.0, interval - (time.monotonic() - start)))
+    except KeyboardInterrupt:
+        pass
+
+
+# Returns the field of a request, raising ValueError unless it is missing or of the expected type.
+def _field(request, name, expected, default=None):
+    value = request.get(name, default)
+    if value is not None and not isinstance(value, expected):
+        raise ValueError("%s has to be a %s" % (name, "list" if expected is list else "string"))
+    return value
+
+
+def _handle_request(request, scanner, watcher):
+    method = request.get("method")
+    if method == "changes":
+        added, removed = watcher.poll()
+        return {"added": [finding._asdict() for finding in added], "removed": [finding._asdict() for finding in removed]}
+    if method == "findings":
+        return {"findings": [finding._asdict() for finding in watcher.findings(_field(request, "path", str))]}
+    if method == "scan":
+        path = _field(request, "path", str, "<content>")
+        content = _field(request, "content", str)
+        if content is not None:
+            findings = scanner.scan_bytes(content.encode("utf-8", "surrogateescape"), path)
+        else:
+            paths = _field(request, "paths", list, [])
+            if not all(isinstance(path, str) for path in paths):
+                raise ValueError("paths has to be a list of strings")
+            findings = scanner.scan_paths(paths, watcher.extensions, watcher.excludes)
+        return {"findings": [finding._asdict() for finding in findings]}
+    raise ValueError("Unknown method: %s" % method)
+
+
+# Answers JSON requests read line by line from infile until it is closed or asked to shut down.
+def serve(scanner, watcher, infile, outfile):
+    for line in infile:
+        if not line.strip():
+            continue
+
+        requestid = None
+        shutdown = False
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Requests have to be JSON objects")
+            requestid = request.get("id")
+            shutdown = request.get("method") == "shutdown"
+            response = {} if shutdown else _handle_request(request, scanner, watcher)
+        except (OSError, TypeError, ValueError) as error:
+            response = {"error": str(error)}
+
+        response["id"] = requestid
+        outfile.write(json.dumps(response) + "\n")
+        outfile.flush()
+        if shutdown:
+            break
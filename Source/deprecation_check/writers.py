@@ -0,0 +1,179 @@
+# Writers that turn findings into output. All of them stream: findings are formatted as they come
+# in and written to the stream in blocks of about buffersize characters, so memory use doesn't grow
+# with the number of findings and the output can be consumed while the scan is still running.
+
+import json
+import os
+from pathlib import Path
+from urllib.parse import quote
+
+FORMATS = ("text", "jsonl", "sarif")
+
+
+# Collects formatted findings and writes them out in blocks instead of one write per finding.
+class _BufferedWriter:
+    def __init__(self, stream, buffersize=1 << 16):
+        self._stream = stream
+        self._buffersize = buffersize
+        self._lines = []
+        self._pending = 0
+
+    def __str__(self):
+        return "%s - %s" % (type(self).__name__, self._stream)
+
+    def __repr__(self):
+        return "%s - %s" % (type(self).__name__, self._stream)
+
+    def _format(self, finding):
+        raise NotImplementedError
+
+    def _write(self, text):
+        self._lines.append(text)
+        self._pending += len(text)
+        if self._pending >= self._buffersize:
+            self.flush()
+
+    def write_findings(self, findings):
+        for finding in findings:
+            self._write(self._format(finding))
+
+    def flush(self):
+        if self._lines:
+            self._stream.write("".join(self._lines))
+            self._lines = []
+            self._pending = 0
+        self._stream.flush()
+
+    def close(self):
+        self.flush()
+
+
+# Writes findings as "path: line N - message" lines.
+class TextWriter(_BufferedWriter):
+    def _format(self, finding):
+        return "%s: line %d - %s\n" % (finding.path, finding.linenumber, finding.message)
+
+
+# Writes every finding as a JSON object with the fields of rules.Finding on a line of its own.
+class JsonLinesWriter(_BufferedWriter):
+    def _format(self, finding):
+        return json.dumps(finding._asdict()) + "\n"
+
+
+# Writes a SARIF 2.1.0 log with a single run. The log is streamed: everything up to the results array
+# is written right away, the results one at a time as they come in, and the rest on close.
+# ruletables are the (category, table) pairs of enabled_rule_tables, listed as the rules of the tool.
+#
+# SARIF counts columns in characters where findings count bytes, so the line of every finding with
+# a column is read back from its file to convert it. Findings come in file and line order, so each
+# file is read forward a line at a time. Lines that aren't valid UTF-8 get no column.
+class SarifWriter(_BufferedWriter):
+    def __init__(self, stream, ruletables=(), buffersize=1 << 16):
+        super().__init__(stream, buffersize)
+        self._results = 0
+        self._sourcepath = None
+        self._sourcefile = None
+        self._sourcelinenum = 0
+        self._sourceline = None
+
+        rules = []
+        for category, table in ruletables:
+            for identifier in sorted(table):
+                rules.append({
+                    "id": "%s/%s" % (category, identifier),
+                    "name": identifier,
+                    "shortDescription": {"text": table[identifier]},
+                    "properties": {"category": category},
+                })
+
+        driver = {"name": "deprecation-check", "rules": rules}
+        header = json.dumps({
+            "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+            "version": "2.1.0",
+            "runs": [{"tool": {"driver": driver}, "columnKind": "unicodeCodePoints", "results": []}],
+        }, indent=2)
+        # The results array comes last, so its opening bracket splits the log into what is written
+        # now and what close() writes.
+        split = header.rindex("[") + 1
+        self._footer = header[split:] + "\n"
+        self._write(header[:split])
+
+    # Returns a line of a source file as bytes, or None if it can't be read.
+    def _source_line(self, path, linenumber):
+        if path != self._sourcepath or linenumber < self._sourcelinenum:
+            self._close_source()
+            self._sourcepath = path
+            try:
+                self._sourcefile = open(path, "rb")
+            except OSError:
+                return None
+        elif self._sourcefile is None:
+            return None
+
+        while self._sourcelinenum < linenumber:
+            self._sourceline = self._sourcefile.readline()
+            self._sourcelinenum += 1
+            if not self._sourceline:
+                return None
+        return self._sourceline
+
+    def _close_source(self):
+        if self._sourcefile is not None:
+            self._sourcefile.close()
+        self._sourcepath = None
+        self._sourcefile = None
+        self._sourcelinenum = 0
+        self._sourceline = None
+
+    # Turns the 1-based byte column of a finding into the 1-based character column SARIF expects.
+    def _char_column(self, finding):
+        line = self._source_line(finding.path, finding.linenumber)
+        if line is None:
+            return None
+
+        prefix = line[:finding.column - 1]
+        if prefix.isascii():
+            return finding.column
+        try:
+            return len(prefix.decode("utf-8")) + 1
+        except UnicodeDecodeError:
+            return None
+
+    def _format(self, finding):
+        location = {"artifactLocation": {"uri": _path_uri(finding.path)}, "region": {"startLine": finding.linenumber}}
+        column = None if finding.column is None else self._char_column(finding)
+        if column is not None:
+            location["region"]["startColumn"] = column
+
+        result = {
+            "ruleId": "%s/%s" % (finding.category, finding.identifier),
+            "level": "note" if finding.category == "cautionary" else "warning",
+            "message": {"text": finding.message},
+            "locations": [{"physicalLocation": location}],
+        }
+        separator = "," if self._results else ""
+        self._results += 1
+        return "%s\n        %s" % (separator, json.dumps(result))
+
+    def close(self):
+        if self._footer is not None:
+            self._write(("\n      " if self._results else "") + self._footer)
+            self._footer = None
+        self._close_source()
+        super().close()
+
+
+# Relative paths stay relative URI references, so the log can be read against any checkout.
+def _path_uri(path):
+    if os.path.isabs(path):
+        return Path(path).as_uri()
+    return quote(path.replace(os.sep, "/"))
+
+
+# Creates the writer for one of FORMATS. ruletables is only used by formats that describe the rules.
+def create_writer(outputformat, stream, ruletables=()):
+    if outputformat == "jsonl":
+        return JsonLinesWriter(stream)
+    if outputformat == "sarif":
+        return SarifWriter(stream, ruletables)
+    return TextWriter(stream)